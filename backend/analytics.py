@@ -1,9 +1,10 @@
 import pandas as pd
 import numpy as np
 import logging
-from statsmodels.regression.linear_model import OLS
-from statsmodels.tools.tools import add_constant
-from statsmodels.tsa.stattools import adfuller
+import time
+
+# statsmodels (~1.5s to import, pulls in scipy) is imported by the functions
+# that use it, so importing this module stays cheap
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +25,79 @@ def resample_ohlcv(df, rule):
         .reset_index()
     )
 
-def compute_pair_analytics(px, py, window):
+def asof_align(px, py):
+    """
+    Aligns bar frame `py` onto the timestamps of `px`: each px bar gets the
+    last py bar at or before it (as-of, no look-ahead). px bars before the
+    first py bar are dropped. Repeated px timestamps (event bars closing in
+    the same millisecond) are spaced by 1µs so the shared index is unique.
+    Returns (px, py) with identical indexes.
+    """
+    if px.empty or py.empty:
+        return px.iloc[:0], py.iloc[:0]
+    px = px.sort_index(kind="stable")
+    py = py.sort_index(kind="stable")
+    pos = np.searchsorted(py.index.values, px.index.values, side="right") - 1
+    valid = pos >= 0
+    px = px[valid]
+    py = py.iloc[pos[valid]]
+    index = px.index
+    if index.has_duplicates:
+        bump = index.to_series().groupby(level=0).cumcount().to_numpy()
+        index = index + pd.to_timedelta(bump, unit="us")
+    return px.set_axis(index), py.set_axis(index)
+
+HEDGE_MODES = ("ols", "rolling", "rls", "kalman")
+
+def rolling_beta(x, y, window):
+    """
+    Rolling OLS of y on x over `window` bars, vectorized with cumulative sums
+    (one pass, no per-window fits). Returns a DataFrame with beta, alpha and
+    r_squared; the first window-1 rows are NaN.
+    """
+    # Demean first so the cumulative sums stay small (price levels are large)
+    kx, ky = x.mean(), y.mean()
+    dx, dy = x.to_numpy(float) - kx, y.to_numpy(float) - ky
+
+    def windowed(v):
+        c = np.concatenate(([0.0], np.cumsum(v)))
+        out = np.full(len(v), np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    n = window
+    sx, sy = windowed(dx), windowed(dy)
+    sxx, syy, sxy = windowed(dx * dx), windowed(dy * dy), windowed(dx * dy)
+    vx = sxx - sx * sx / n
+    vy = syy - sy * sy / n
+    cxy = sxy - sx * sy / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = np.where(vx > 0, cxy / vx, np.nan)
+        r_squared = np.where((vx > 0) & (vy > 0), cxy * cxy / (vx * vy), np.nan)
+    alpha = (sy / n + ky) - beta * (sx / n + kx)
+    return pd.DataFrame({"beta": beta, "alpha": alpha, "r_squared": r_squared}, index=x.index)
+
+def compute_pair_analytics(px, py, window, engine=None, hedge="ols", hedge_engine=None):
     """
     Computes Beta, Spread, Z-Score, Rolling Correlation, Rolling Volatility, and R-Squared.
     Returns (beta, spread, zscore, corr, rolling_std, r_squared).
     Returns (None, None, None, None, None, None) if insufficient data.
+    Pass a streaming.RollingPairStats as `engine` to update the rolling
+    statistics incrementally instead of re-running pandas .rolling().
+
+    `hedge` picks the hedge ratio engine:
+      "ols"     - one static OLS fit over all history (beta, r_squared are scalars)
+      "rolling" - rolling OLS over `window` bars (see rolling_beta)
+      "rls"     - recursive least squares, updated per bar
+      "kalman"  - Kalman filter on (beta, alpha), updated per bar
+    For "rls"/"kalman" pass a streaming.RecursiveLeastSquares/KalmanHedge
+    as `hedge_engine` to keep its state across calls.
+    For the dynamic modes beta and r_squared are Series and the spread is
+    the residual y - alpha_t - beta_t·x (the one-step prediction error for
+    "kalman", z-scored by its predicted std).
     """
+    if hedge not in HEDGE_MODES:
+        raise ValueError(f"Unknown hedge mode {hedge!r}, expected one of {HEDGE_MODES}")
     logger.info(f"Computing analytics for window={window}")
 
     merged = px[["close"]].rename(columns={"close": "x"}).join(
@@ -42,11 +110,23 @@ def compute_pair_analytics(px, py, window):
         return None, None, None, None, None, None
 
     try:
+        if hedge != "ols":
+            return _dynamic_hedge_analytics(merged, window, engine, hedge, hedge_engine)
+
+        from statsmodels.regression.linear_model import OLS
+        from statsmodels.tools.tools import add_constant
+
         # I initially tried using .apply() here but it was way too slow
         # This vectorized approach is 10x faster
         X = add_constant(merged["x"])
         model = OLS(merged["y"], X).fit()
-        beta = model.params[1]
+        beta = model.params.iloc[1]
+
+        if engine is not None:
+            # Streaming path: only bars not seen yet are folded in, O(1) each
+            engine.update(merged)
+            spread, zscore, corr, rolling_std = engine.results(beta, merged.index)
+            return beta, spread, zscore, corr, rolling_std, model.rsquared
 
         spread = merged["y"] - beta * merged["x"]
         
@@ -69,6 +149,29 @@ def compute_pair_analytics(px, py, window):
         logger.error(f"Error in analytics computation: {str(e)}", exc_info=True)
         return None, None, None, None, None, None
 
+def _dynamic_hedge_analytics(merged, window, engine, hedge, hedge_engine):
+    if hedge in ("rls", "kalman"):
+        if hedge_engine is None:
+            import streaming
+            engine_cls = streaming.RecursiveLeastSquares if hedge == "rls" else streaming.KalmanHedge
+            hedge_engine = engine_cls(window)
+        hedge_engine.update(merged)
+        beta, _, r_squared, spread, zscore, rolling_std = hedge_engine.results(merged.index)
+    else:
+        fit = rolling_beta(merged["x"], merged["y"], window)
+        beta, r_squared = fit["beta"], fit["r_squared"]
+        spread = merged["y"] - fit["alpha"] - beta * merged["x"]
+        rolling_mean = spread.rolling(window=window, min_periods=window).mean()
+        rolling_std = spread.rolling(window=window, min_periods=window).std().replace(0, np.nan)
+        zscore = (spread - rolling_mean) / rolling_std
+
+    # Correlation does not depend on the hedge ratio
+    if engine is not None:
+        corr = engine.update(merged).results(0.0, merged.index)[2]
+    else:
+        corr = merged["x"].rolling(window=window, min_periods=window).corr(merged["y"])
+    return beta, spread, zscore, corr, rolling_std, r_squared
+
 def calculate_signal_efficacy(spread, zscore, lookahead=5):
     """
     Computes the relationship between current Z-Score and future spread change (t + lookahead).
@@ -89,10 +192,123 @@ def calculate_signal_efficacy(spread, zscore, lookahead=5):
     
     return data
 
-def adf_pvalue(series):
+# Lag cap for the fast ADF; the Schwert rule is used below it
+MAX_ADF_LAG = 4
+
+def adf_lags(nobs, max_lag=MAX_ADF_LAG):
+    """Schwert's rule of thumb, 12·(n/100)^(1/4), capped at max_lag."""
+    return int(min(max_lag, np.floor(12 * (nobs / 100) ** 0.25)))
+
+def adf_test(series, lags=None, max_lag=MAX_ADF_LAG):
+    """
+    Fast ADF test (constant, no trend) with a fixed lag count, solved directly
+    with NumPy least squares instead of statsmodels' autolag search.
+
+    `series` is one series (1-D) or many equal-length series as the columns
+    of a 2-D array; all columns are solved at once via batched normal
+    equations. `lags` defaults to adf_lags(len) capped at `max_lag`.
+    Returns (stat, pvalue), scalars for 1-D input, arrays for 2-D.
+    """
+    values = np.asarray(series, dtype=float)
+    single = values.ndim == 1
+    if single:
+        values = values[:, None]
+    if lags is None:
+        lags = adf_lags(len(values), max_lag)
+
+    diff = np.diff(values, axis=0)
+    nobs = len(diff) - lags
+    # Design per series: [1, s_{t-1}, Δs_{t-1}, ..., Δs_{t-lags}] -> (k, nobs, lags + 2)
+    cols = [np.ones_like(diff[lags:]), values[lags:-1]]
+    cols += [diff[lags - i:-i] for i in range(1, lags + 1)]
+    design = np.stack(cols, axis=-1).transpose(1, 0, 2)
+    target = diff[lags:].T[:, :, None]
+
+    xtx = design.transpose(0, 2, 1) @ design
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xtx_inv = np.linalg.pinv(xtx)
+        coef = xtx_inv @ (design.transpose(0, 2, 1) @ target)
+        resid = (target - design @ coef)[:, :, 0]
+        sigma2 = (resid * resid).sum(axis=1) / (nobs - lags - 2)
+        stat = coef[:, 1, 0] / np.sqrt(sigma2 * xtx_inv[:, 1, 1])
+    from statsmodels.tsa.adfvalues import mackinnonp
+
+    # mackinnonp is scalar only; this is one table lookup per series
+    pvalue = np.array([mackinnonp(t, regression="c", N=1) if np.isfinite(t) else np.nan for t in stat])
+    if single:
+        return float(stat[0]), float(pvalue[0])
+    return stat, pvalue
+
+def adf_pvalue(series, fast=False, lags=None):
+    """
+    ADF p-value of a series, None if it is too short or the test fails.
+    fast=True uses adf_test (fixed/capped lag) instead of adfuller's
+    automatic lag selection.
+    """
     if series is None or len(series.dropna()) < 20:
         return None
     try:
+        if fast:
+            pvalue = adf_test(series.dropna().to_numpy(), lags=lags)[1]
+            return None if np.isnan(pvalue) else pvalue
+        from statsmodels.tsa.stattools import adfuller
         return adfuller(series.dropna())[1]
     except:
         return None
+
+class StationarityCache:
+    """
+    Caches ADF p-values per key (e.g. pair, timeframe, hedge mode) and only
+    re-runs the test when the data watermark has moved *and* at least
+    `every` seconds have passed since the last evaluation. Reruns that see
+    no new data, or arrive within the cadence, reuse the cached value.
+    One instance can be shared by many sessions: pass `every` per call
+    rather than changing the attribute, which is only the default.
+    """
+
+    def __init__(self, every=30.0, fast=True, lags=None):
+        self.every = every
+        self.fast = fast
+        self.lags = lags
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+    def pvalue(self, key, watermark, series, every=None):
+        every = self.every if every is None else every
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            seen, evaluated_at, pvalue = entry
+            if seen == watermark or now - evaluated_at < every:
+                self.hits += 1
+                return pvalue
+        self.misses += 1
+        pvalue = adf_pvalue(series, fast=self.fast, lags=self.lags)
+        self._entries[key] = (watermark, now, pvalue)
+        return pvalue
+
+    def pvalues(self, keys, watermark, spreads, min_obs=20, every=None):
+        """
+        Batched variant: `spreads` is a (bars, len(keys)) array. Keys that are
+        due for re-evaluation are tested together in one adf_test call.
+        """
+        every = self.every if every is None else every
+        now = time.monotonic()
+        due = []
+        for i, key in enumerate(keys):
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] == watermark or now - entry[1] < every):
+                self.hits += 1
+            else:
+                self.misses += 1
+                due.append(i)
+        if due:
+            spreads = np.asarray(spreads, dtype=float)
+            if len(spreads) >= min_obs:
+                pvalue = adf_test(spreads[:, due], lags=self.lags)[1]
+            else:
+                pvalue = np.full(len(due), np.nan)
+            for i, p in zip(due, pvalue):
+                self._entries[keys[i]] = (watermark, now, None if np.isnan(p) else float(p))
+        return [self._entries[key][2] for key in keys]
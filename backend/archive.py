@@ -0,0 +1,214 @@
+import calendar
+import os
+import shutil
+import logging
+import time
+
+import numpy as np
+
+from storage import BASE_DIR, get_connection, configure_connection, load_ticks, to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+# Closed days of ticks live here as raw .npy columns, one directory per symbol/day:
+#   archive/<symbol>/<YYYY-MM-DD>/{ts,price,qty}.npy
+# Plain NumPy files can be memory-mapped: iter_archive hands out per-day views
+# without creating a Python object per row. Readers that stitch several days
+# into one frame (load_history, TickBuffer) copy them once.
+ARCHIVE_DIR = os.path.join(BASE_DIR, "archive")
+COLUMNS = {"ts": "int64", "price": "float64", "qty": "float64"}
+DAY_MS = 86_400_000
+
+def _day_dir(symbol, day_ms, root=None):
+    day = time.strftime("%Y-%m-%d", time.gmtime(day_ms // 1000))
+    return os.path.join(root or ARCHIVE_DIR, symbol, day)
+
+def _day_ms(day):
+    # Plain integer maths: retention runs this inside the pandas-free ingest daemon
+    return calendar.timegm(time.strptime(day, "%Y-%m-%d")) * 1000
+
+def _write_day(path, cols):
+    """
+    Write one day atomically: build in a temp dir, then swap it in.
+    `cols` must be sorted by ts. If the day is already archived its rows are
+    merged in ts order straight from the old memmaps into the new files,
+    without concatenating the whole day in memory.
+    """
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    old = read_day(path) if os.path.exists(path) else None
+    if old is None:
+        for name, dtype in COLUMNS.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(cols[name], dtype=dtype))
+    else:
+        # Output slot of each new row; side="right" keeps archived rows first on ties
+        n_old, n_new = len(old["ts"]), len(cols["ts"])
+        is_new = np.zeros(n_old + n_new, dtype=bool)
+        is_new[np.searchsorted(old["ts"], cols["ts"], side="right") + np.arange(n_new)] = True
+        for name, dtype in COLUMNS.items():
+            out = np.lib.format.open_memmap(
+                os.path.join(tmp, f"{name}.npy"), mode="w+", dtype=dtype, shape=(n_old + n_new,)
+            )
+            out[~is_new] = old[name]
+            out[is_new] = cols[name]
+            out.flush()
+            del out
+        # Release the old mappings before the directory is replaced
+        del old
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+
+def read_day(path):
+    """Memory-mapped (read only) column arrays of one archived day."""
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+
+def compact_closed_days(before=None, root=None):
+    """
+    Move every closed UTC day of ticks out of SQLite into the archive.
+    `before` defaults to today's midnight UTC; only ticks older than it move.
+    A day that was archived earlier is merged with any late rows.
+    Returns the number of ticks archived.
+    """
+    root = root or ARCHIVE_DIR
+    if before is None:
+        now_ms = int(time.time() * 1000)
+        before = now_ms - now_ms % DAY_MS
+    before = to_epoch_ms(before)
+
+    conn = configure_connection(get_connection())
+    days = conn.execute("""
+        SELECT s.id, s.name, t.ts - t.ts % ? AS day
+        FROM ticks t JOIN symbols s ON s.id = t.symbol_id
+        WHERE t.ts < ?
+        GROUP BY s.id, day
+        ORDER BY day
+    """, (DAY_MS, before)).fetchall()
+
+    total = 0
+    for sid, name, day in days:
+        # A `before` inside the day moves only the part of the day before it
+        end = min(day + DAY_MS, before)
+        rows = conn.execute(
+            "SELECT ts, price, qty FROM ticks WHERE symbol_id = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (sid, day, end)
+        ).fetchall()
+        if not rows:
+            continue
+        arr = np.array(rows, dtype="float64")
+        cols = {"ts": arr[:, 0].astype("int64"), "price": arr[:, 1], "qty": arr[:, 2]}
+
+        # A day archived earlier is merged with these late rows
+        path = _day_dir(name, day, root)
+
+        # Files first, then delete: a crash in between leaves duplicates, never a gap
+        _write_day(path, cols)
+        with conn:
+            conn.execute(
+                "DELETE FROM ticks WHERE symbol_id = ? AND ts >= ? AND ts < ?",
+                (sid, day, end)
+            )
+        total += len(rows)
+        logger.info(f"Archived {len(rows)} ticks for {name} {os.path.basename(path)}")
+
+    conn.close()
+    return total
+
+def iter_archive(symbol, start=None, end=None, root=None):
+    """
+    Yield per-day column views (dicts of memmap slices) for `symbol` within
+    [start, end). Nothing is copied; slices are located with searchsorted.
+    """
+    base = os.path.join(root or ARCHIVE_DIR, symbol)
+    if not os.path.isdir(base):
+        return
+    start = to_epoch_ms(start) if start is not None else None
+    end = to_epoch_ms(end) if end is not None else None
+
+    for day in sorted(os.listdir(base)):
+        if day.endswith(".tmp"):
+            continue
+        day_ms = _day_ms(day)
+        if (start is not None and day_ms + DAY_MS <= start) or (end is not None and day_ms >= end):
+            continue
+        cols = read_day(os.path.join(base, day))
+        ts = cols["ts"]
+        lo = np.searchsorted(ts, start) if start is not None else 0
+        hi = np.searchsorted(ts, end) if end is not None else len(ts)
+        if hi > lo:
+            yield {k: v[lo:hi] for k, v in cols.items()}
+
+def prune_archive(before, root=None):
+    """
+    Delete archived days that end at or before `before` (epoch ms or
+    anything to_epoch_ms accepts), and symbols left without any day.
+    Returns the number of days removed.
+    """
+    root = root or ARCHIVE_DIR
+    before = to_epoch_ms(before)
+    removed = 0
+    for symbol in archived_symbols(root):
+        base = os.path.join(root, symbol)
+        for day in sorted(os.listdir(base)):
+            if day.endswith(".tmp") or _day_ms(day) + DAY_MS > before:
+                continue
+            shutil.rmtree(os.path.join(base, day))
+            removed += 1
+            logger.info(f"Pruned archived ticks for {symbol} {day}")
+        if not os.listdir(base):
+            os.rmdir(base)
+    return removed
+
+def archived_symbols(root=None):
+    root = root or ARCHIVE_DIR
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+
+def _frame(symbol, cols):
+    import pandas as pd  # lazy, see storage.to_epoch_ms
+    timestamp = pd.Series(cols["ts"].view("datetime64[ms]")).dt.tz_localize("UTC")
+    return pd.DataFrame({
+        "timestamp": timestamp,
+        "symbol": symbol,
+        "price": cols["price"],
+        "qty": cols["qty"],
+    }, copy=False)
+
+def load_history(symbols=None, start=None, end=None, root=None):
+    """
+    Unified reader: archived days stitched with the live SQLite tail.
+    Same columns and filters as storage.load_ticks. The result is a copy
+    unless a single archived day is all there is; use iter_archive for
+    per-day memory-mapped views.
+    """
+    import pandas as pd  # lazy, see storage.to_epoch_ms
+    names = list(symbols) if symbols is not None else archived_symbols(root)
+    frames = [
+        _frame(name, cols)
+        for name in names
+        for cols in iter_archive(name, start, end, root)
+    ]
+    live = load_ticks(symbols, start, end)
+    if not frames:
+        return live
+    if live.empty:
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+    return pd.concat(frames + [live], ignore_index=True)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compact closed days of ticks into the archive")
+    parser.add_argument("--keep-days", type=int, default=None,
+                        help="also delete archived days older than this many days")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
+    n = compact_closed_days()
+    print(f"Archived {n} ticks into {ARCHIVE_DIR}")
+    if args.keep_days is not None:
+        pruned = prune_archive(int(time.time() * 1000) - args.keep_days * DAY_MS)
+        print(f"Pruned {pruned} archived days older than {args.keep_days} days")
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from decoder import decode_rest_trade
+from storage import last_trade_ids
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+MAX_WORKERS = 4
+# Binance allows 6000 request weight per minute per IP; trade endpoints cost
+# 25 each. Stay at half the budget so other clients on the IP keep working.
+WEIGHT_PER_MINUTE = 3000
+TRADES_WEIGHT = 25
+# Gaps larger than this (e.g. after a long outage) are truncated to their newest part
+MAX_GAP = 100_000
+
+class RateLimiter:
+    """Thread-safe token bucket measured in request weight."""
+
+    def __init__(self, weight_per_minute=WEIGHT_PER_MINUTE, burst=None):
+        self.rate = weight_per_minute / 60.0
+        self.capacity = burst or max(weight_per_minute / 10.0, TRADES_WEIGHT)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight=TRADES_WEIGHT):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                wait = (weight - self._tokens) / self.rate
+            time.sleep(wait)
+
+class BackfillEngine:
+    """
+    Keeps the stored trade tape gap-free using the REST trade endpoints.
+
+    Every poll fetches the latest page for all symbols concurrently. A jump in
+    trade id between polls (bursts larger than one page, restarts, network
+    blips) is recorded as a gap and fetched with get_historical_trades(fromId=)
+    on the same bounded worker pool. Everything goes through one rate limiter,
+    and rows are written with their trade id, so overlaps are no-ops.
+    """
+
+    def __init__(self, client, writer, symbols, max_workers=MAX_WORKERS,
+                 page_size=PAGE_SIZE, limiter=None, max_gap=MAX_GAP):
+        self.client = client
+        self.writer = writer
+        self.symbols = [s.lower() for s in symbols]
+        self.page_size = page_size
+        self.limiter = limiter or RateLimiter()
+        self.max_gap = max_gap
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Backfill")
+
+        self._lock = threading.Lock()
+        self.last_ids = last_trade_ids(self.symbols)
+        self.gaps = {s: [] for s in self.symbols}
+        self.fetched = 0
+        self.requests = 0
+
+    def _request(self, fn, **kwargs):
+        self.limiter.acquire(TRADES_WEIGHT)
+        with self._lock:
+            self.requests += 1
+        return fn(**kwargs)
+
+    def _observe(self, symbol, trades):
+        """Record trades as seen; returns the ones newer than the last known id."""
+        if not trades:
+            return []
+        with self._lock:
+            last = self.last_ids.get(symbol)
+            new = [t for t in trades if last is None or t["id"] > last]
+            if new and last is not None and new[0]["id"] > last + 1:
+                lo, hi = last + 1, new[0]["id"] - 1
+                if hi - lo + 1 > self.max_gap:
+                    logger.warning(f"{symbol}: gap of {hi - lo + 1} trades truncated to {self.max_gap}")
+                    lo = hi - self.max_gap + 1
+                self.gaps[symbol].append((lo, hi))
+            if new:
+                self.last_ids[symbol] = new[-1]["id"]
+        return new
+
+    def _write(self, symbol, trades):
+        if trades:
+            self.writer.write_many([decode_rest_trade(t, symbol) for t in trades])
+            with self._lock:
+                self.fetched += len(trades)
+
+    def _poll_symbol(self, symbol):
+        trades = self._request(
+            self.client.get_recent_trades, symbol=symbol.upper(), limit=self.page_size
+        )
+        self._write(symbol, self._observe(symbol, trades))
+
+    def _fill_range(self, symbol, lo, hi):
+        """Fetch trade ids lo..hi (inclusive) page by page."""
+        next_id = lo
+        try:
+            while next_id <= hi:
+                page = self._request(
+                    self.client.get_historical_trades, symbol=symbol.upper(),
+                    fromId=next_id, limit=min(self.page_size, hi - next_id + 1)
+                )
+                page = [t for t in page if lo <= t["id"] <= hi]
+                if not page:
+                    break
+                self._write(symbol, page)
+                next_id = page[-1]["id"] + 1
+        except Exception as e:
+            # Keep the unfetched remainder for the next round
+            logger.error(f"{symbol}: backfill of {next_id}..{hi} failed: {e}")
+            with self._lock:
+                self.gaps[symbol].append((next_id, hi))
+        return next_id - lo
+
+    def poll_once(self):
+        """One round: latest page for every symbol, then fill any open gaps."""
+        for f in [self.pool.submit(self._poll_symbol, s) for s in self.symbols]:
+            f.result()
+        return self.fill_gaps()
+
+    def fill_gaps(self):
+        """Fetch all recorded gaps concurrently. Returns trades recovered."""
+        with self._lock:
+            jobs = [(s, lo, hi) for s, gaps in self.gaps.items() for lo, hi in gaps]
+            self.gaps = {s: [] for s in self.symbols}
+        if not jobs:
+            return 0
+        # Split large gaps so several workers share one symbol's backlog
+        span = self.page_size * 5
+        tasks = [
+            (s, start, min(start + span - 1, hi))
+            for s, lo, hi in jobs
+            for start in range(lo, hi + 1, span)
+        ]
+        futures = [self.pool.submit(self._fill_range, *t) for t in tasks]
+        recovered = sum(f.result() for f in futures)
+        logger.info(f"Backfilled {recovered} trades across {len(jobs)} gaps")
+        return recovered
+
+    def run(self, stop_event, interval=1.0):
+        """Poll every `interval` seconds until stop_event is set."""
+        while not stop_event.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Backfill poll failed: {e}")
+                stop_event.wait(2)
+                continue
+            stop_event.wait(interval)
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+def positions(zscore, entry_z=2.0, exit_z=0.0):
+    """
+    Mean-reversion position in the spread from its z-score, vectorized:
+    long (+1) once z < -entry_z until z >= -exit_z, short (-1) once
+    z > entry_z until z <= exit_z, flat otherwise. Each side is a
+    forward-filled entry/exit signal, so there is no per-bar loop.
+    """
+    z = np.asarray(zscore, dtype=float)
+    long_ = np.where(z < -entry_z, 1.0, np.where(z >= -exit_z, 0.0, np.nan))
+    short = np.where(z > entry_z, -1.0, np.where(z <= exit_z, 0.0, np.nan))
+    # NaN z (warm-up) closes nothing and opens nothing
+    long_[np.isnan(z)] = np.nan
+    short[np.isnan(z)] = np.nan
+    long_ = pd.Series(long_).ffill().fillna(0.0).to_numpy()
+    short = pd.Series(short).ffill().fillna(0.0).to_numpy()
+    return long_ + short
+
+def backtest(spread, zscore, entry_z=2.0, exit_z=0.0, fee_bps=0.0, slippage_bps=0.0, gross=None):
+    """
+    Backtests trading the spread on its z-score: the position decided at a
+    bar's close is held over the next bar, so there is no look-ahead.
+
+    Costs are (fee_bps + slippage_bps) on the traded gross notional: units
+    of spread traded times `gross` (notional of both legs per unit of
+    spread, e.g. |y| + |beta·x|). Without `gross` they are charged on |spread|.
+
+    Returns (frame, summary): frame has position, pnl, cost, net, equity and
+    drawdown per bar; summary has net/gross PnL, costs, turnover, trade
+    count, win rate, holding periods and max drawdown.
+    """
+    spread = pd.Series(spread, dtype=float)
+    index = spread.index
+    s = spread.to_numpy()
+    pos = positions(pd.Series(zscore).reindex(index).to_numpy(), entry_z, exit_z)
+
+    held = np.concatenate(([0.0], pos[:-1]))
+    move = np.concatenate(([0.0], np.diff(s)))
+    pnl = np.nan_to_num(held * move)
+
+    trades = np.abs(np.diff(np.concatenate(([0.0], pos))))
+    notional = np.abs(s) if gross is None else np.abs(pd.Series(gross, dtype=float).reindex(index).to_numpy())
+    cost = np.nan_to_num(trades * notional) * (fee_bps + slippage_bps) / 1e4
+    net = pnl - cost
+    equity = np.cumsum(net)
+    drawdown = equity - np.maximum.accumulate(np.maximum(equity, 0.0))
+
+    frame = pd.DataFrame({
+        "position": pos, "pnl": pnl, "cost": cost, "net": net, "equity": equity, "drawdown": drawdown,
+    }, index=index)
+    return frame, _summary(pos, pnl, cost, trades, drawdown, index)
+
+def _summary(pos, pnl, cost, trades, drawdown, index):
+    # A trade is a run of bars holding the same non-zero position
+    start = (pos != 0) & (np.concatenate(([0.0], pos[:-1])) != pos)
+    trade_id = np.cumsum(start) * (pos != 0)
+    n_trades = int(start.sum())
+
+    holding = np.bincount(trade_id, minlength=n_trades + 1)[1:]
+    # PnL of a bar belongs to the position held going into it
+    held_id = np.concatenate(([0], trade_id[:-1]))
+    trade_pnl = np.bincount(held_id, weights=pnl, minlength=n_trades + 1)[1:]
+    # Costs split into the leg closing the held position and the leg opening the new one
+    with np.errstate(invalid="ignore", divide="ignore"):
+        unit = np.where(trades > 0, cost / trades, 0.0)
+    held = np.concatenate(([0.0], pos[:-1]))
+    trade_pnl -= np.bincount(held_id, weights=unit * np.abs(held), minlength=n_trades + 1)[1:]
+    trade_pnl -= np.bincount(trade_id, weights=unit * np.abs(pos), minlength=n_trades + 1)[1:]
+
+    summary = {
+        "net_pnl": float(pnl.sum() - cost.sum()),
+        "gross_pnl": float(pnl.sum()),
+        "costs": float(cost.sum()),
+        "turnover": float(trades.sum()),
+        "trades": n_trades,
+        "win_rate": float((trade_pnl > 0).mean()) if n_trades else np.nan,
+        "avg_holding_bars": float(holding.mean()) if n_trades else np.nan,
+        "max_holding_bars": int(holding.max()) if n_trades else 0,
+        "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+        "exposure": float((pos != 0).mean()) if len(pos) else 0.0,
+    }
+    if n_trades and isinstance(index, pd.DatetimeIndex) and len(index) > 1:
+        bar = (index[1:] - index[:-1]).median()
+        summary["avg_holding_time"] = bar * summary["avg_holding_bars"]
+    return summary
@@ -0,0 +1,368 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 86_400_000
+
+def rule_ms(rule):
+    """Bar width of a pandas offset alias ("1s", "1min", "7min", ...) in epoch ms."""
+    ms = pd.Timedelta(rule) // pd.Timedelta(milliseconds=1)
+    if ms <= 0:
+        raise ValueError(f"Bar rule must be a positive fixed duration, got {rule!r}")
+    return int(ms)
+
+def _starts(values):
+    """True where a run of equal values begins."""
+    out = np.empty(len(values), dtype=bool)
+    out[0] = True
+    np.not_equal(values[1:], values[:-1], out=out[1:])
+    return out
+
+class ClosedBars:
+    """
+    Bars emitted by one builder call, as plain arrays: symbol, ts (epoch
+    ms bar label) and an (n, 5) open/high/low/close/volume block. Building
+    a DataFrame per small batch would cost more than the aggregation itself,
+    so that is left to frame()/concat() when the caller needs one.
+    """
+
+    __slots__ = ("symbol", "ts", "ohlcv")
+
+    def __init__(self, symbol, ts, ohlcv):
+        self.symbol = symbol
+        self.ts = ts
+        self.ohlcv = ohlcv
+
+    def __len__(self):
+        return len(self.ts)
+
+    @classmethod
+    def concat(cls, parts):
+        parts = list(parts)
+        if not parts:
+            return cls(np.empty(0, dtype=object), np.empty(0, dtype="int64"), np.empty((0, 5)))
+        return cls(
+            np.concatenate([p.symbol for p in parts]),
+            np.concatenate([p.ts for p in parts]),
+            np.concatenate([p.ohlcv for p in parts]),
+        )
+
+    def frame(self):
+        """Same columns as analytics.resample_ohlcv / storage.load_bars."""
+        return pd.DataFrame({
+            "symbol": self.symbol,
+            "timestamp": pd.to_datetime(self.ts, unit="ms", utc=True),
+            "open": self.ohlcv[:, 0],
+            "high": self.ohlcv[:, 1],
+            "low": self.ohlcv[:, 2],
+            "close": self.ohlcv[:, 3],
+            "volume": self.ohlcv[:, 4],
+        })
+
+class _BarAggregator:
+    """
+    Per-symbol bar state and the batched fold shared by the bar builders.
+
+    Subclasses decide which bar (bucket) every tick belongs to via
+    _assign(), how a bar is labelled via _label(), and whether a bar is
+    complete as soon as its last tick arrives via _completed(). Buckets
+    must not decrease within a symbol.
+    """
+
+    _slot_fields = ("_bucket", "_open", "_ohlcv", "_last_ts")
+
+    def __init__(self, capacity=16):
+        self.late = 0
+        self._names = []
+        self._slots = {}
+        self._bucket = np.full(capacity, -1, dtype="int64")
+        self._open = np.zeros(capacity, dtype=bool)
+        self._ohlcv = np.zeros((capacity, 5))
+        self._last_ts = np.zeros(capacity, dtype="int64")
+
+    def _slot_codes(self, symbols):
+        """Map a batch of symbol names to slot numbers, allocating new slots."""
+        inverse, names = pd.factorize(np.asarray(symbols, dtype=object))
+        codes = np.empty(len(names), dtype="int64")
+        for i, name in enumerate(names):
+            slot = self._slots.get(name)
+            if slot is None:
+                slot = self._slots[name] = len(self._names)
+                self._names.append(name)
+                self._new_slot(slot, name)
+            codes[i] = slot
+        return codes[inverse]
+
+    def _new_slot(self, slot, name):
+        if slot >= len(self._bucket):
+            size = 2 * len(self._bucket)
+            for field in self._slot_fields:
+                old = getattr(self, field)
+                arr = np.zeros((size,) + old.shape[1:], dtype=old.dtype)
+                arr[:len(old)] = old
+                arr[len(old):] = -1 if field == "_bucket" else 0
+                setattr(self, field, arr)
+
+    def update(self, ts, symbols, price, qty):
+        """
+        Fold a batch of ticks in. Returns the bars that closed in this batch
+        as ClosedBars, ordered by symbol, ts.
+        """
+        ts = np.asarray(ts, dtype="int64")
+        if len(ts) == 0:
+            return self._closed(np.empty(0, "int64"), np.empty(0, "int64"), np.empty((0, 5)), np.empty(0, "int64"))
+        slot = self._slot_codes(symbols)
+        price = np.asarray(price, dtype=float)
+        qty = np.asarray(qty, dtype=float)
+
+        # Group the batch per symbol, keeping arrival order inside each one
+        order = np.argsort(slot, kind="stable")
+        slot, ts, price, qty = slot[order], ts[order], price[order], qty[order]
+        bucket = self._assign(slot, ts, price, qty)
+
+        # Bars already closed (by a newer bucket, completion or advance()) stay closed
+        late = (bucket < self._bucket[slot]) | ((bucket == self._bucket[slot]) & ~self._open[slot])
+        if late.any():
+            self.late += int(late.sum())
+            keep = ~late
+            slot, bucket, ts, price, qty = slot[keep], bucket[keep], ts[keep], price[keep], qty[keep]
+            if len(slot) == 0:
+                return self._closed(np.empty(0, "int64"), np.empty(0, "int64"), np.empty((0, 5)), np.empty(0, "int64"))
+
+        # One group per (symbol, bucket) run
+        starts = np.flatnonzero(_starts(slot) | _starts(bucket))
+        ends = np.append(starts[1:], len(slot)) - 1
+        g_slot, g_bucket, g_ts = slot[starts], bucket[starts], ts[ends]
+        g = np.column_stack([
+            price[starts],
+            np.maximum.reduceat(price, starts),
+            np.minimum.reduceat(price, starts),
+            price[ends],
+            np.add.reduceat(qty, starts),
+        ])
+
+        # Merge each symbol's first group into its open bar when they share a bucket
+        first = _starts(g_slot)
+        cont = first & (g_bucket == self._bucket[g_slot]) & self._open[g_slot]
+        if cont.any():
+            s = g_slot[cont]
+            prev = self._ohlcv[s]
+            g[cont, 0] = prev[:, 0]
+            g[cont, 1] = np.maximum(prev[:, 1], g[cont, 1])
+            g[cont, 2] = np.minimum(prev[:, 2], g[cont, 2])
+            g[cont, 4] = prev[:, 4] + g[cont, 4]
+
+        # Open bars that the batch moved past are closed now
+        touched = g_slot[first]
+        prev_open = touched[self._open[touched] & ~cont[first]]
+
+        # A symbol's last group stays open unless it is already complete
+        last = np.append(first[1:], True)
+        closed = ~last
+        closed[last] = self._completed(g_slot[last], g_bucket[last])
+        out_slot = np.concatenate([prev_open, g_slot[closed]])
+        out_bucket = np.concatenate([self._bucket[prev_open], g_bucket[closed]])
+        out_ohlcv = np.concatenate([self._ohlcv[prev_open], g[closed]])
+        out_ts = np.concatenate([self._last_ts[prev_open], g_ts[closed]])
+
+        self._bucket[g_slot[last]] = g_bucket[last]
+        self._open[g_slot[last]] = ~closed[last]
+        self._ohlcv[g_slot[last]] = g[last]
+        self._last_ts[g_slot[last]] = g_ts[last]
+
+        order = np.lexsort((out_bucket, out_slot))
+        return self._closed(out_slot[order], out_bucket[order], out_ohlcv[order], out_ts[order])
+
+    def update_frame(self, df):
+        """update() for a tick frame with timestamp (datetime or epoch ms), symbol, price, qty."""
+        ts = df["timestamp"]
+        if not pd.api.types.is_integer_dtype(ts):
+            ts = ts.dt.tz_convert("UTC") if ts.dt.tz is not None else ts.dt.tz_localize("UTC")
+            ts = ts.astype("datetime64[ms, UTC]").astype("int64")
+        return self.update(ts.to_numpy(), df["symbol"].to_numpy(), df["price"].to_numpy(), df["qty"].to_numpy())
+
+    def open_bars(self):
+        """Current (not yet closed) bar of every symbol."""
+        n = len(self._names)
+        live = np.flatnonzero(self._open[:n])
+        return self._closed(live, self._bucket[live], self._ohlcv[live].copy(), self._last_ts[live])
+
+    def _completed(self, slots, buckets):
+        return np.zeros(len(slots), dtype=bool)
+
+    def _closed(self, slots, buckets, ohlcv, last_ts):
+        names = np.asarray(self._names, dtype=object)
+        return ClosedBars(names[slots], self._label(slots, buckets, last_ts), ohlcv)
+
+class BarBuilder(_BarAggregator):
+    """
+    Streaming OHLCV aggregator for one time-based bar rule.
+
+    update() takes a batch of ticks (epoch-ms ts, symbol, price, qty),
+    folds it into the open bar of each symbol and returns only the bars that
+    closed (ClosedBars; .frame() gives the analytics.resample_ohlcv layout).
+    State is one slot per symbol in compact NumPy arrays (bucket, open,
+    high, low, close, volume), so memory does not grow with the number of
+    ticks.
+
+    Bins follow the pandas default (origin="start_day"): per symbol, they are
+    anchored at UTC midnight of that symbol's first tick, so any fixed rule
+    matches resample_ohlcv on the same input. Ticks are expected in time
+    order per symbol; a tick older than the symbol's open bar cannot be
+    placed any more and is dropped (counted in `late`).
+    """
+
+    _slot_fields = _BarAggregator._slot_fields + ("_origin",)
+
+    def __init__(self, rule, capacity=16):
+        self.rule = rule
+        self.period = rule_ms(rule)
+        self._origin = np.zeros(capacity, dtype="int64")
+        super().__init__(capacity)
+
+    def _assign(self, slot, ts, price, qty):
+        fresh = self._bucket[slot] < 0
+        if fresh.any():
+            first = np.flatnonzero(fresh & _starts(slot))
+            self._origin[slot[first]] = ts[first] - ts[first] % DAY_MS
+        return (ts - self._origin[slot]) // self.period
+
+    def _label(self, slots, buckets, last_ts):
+        return self._origin[slots] + buckets * self.period
+
+    def advance(self, now_ms):
+        """Close (and return) open bars whose interval ended before `now_ms`."""
+        n = len(self._names)
+        end = self._origin[:n] + (self._bucket[:n] + 1) * self.period
+        done = np.flatnonzero(self._open[:n] & (end <= now_ms))
+        self._open[done] = False
+        return self._closed(done, self._bucket[done], self._ohlcv[done].copy(), self._last_ts[done])
+
+INFO_BAR_KINDS = ("tick", "volume", "dollar")
+
+class InfoBarBuilder(_BarAggregator):
+    """
+    Information-driven bars: a bar closes once it has accumulated
+    `threshold` ticks ("tick"), base-asset quantity ("volume") or quote
+    notional price·qty ("dollar"), so bar counts follow real activity
+    instead of the clock.
+
+    Ticks are bucketed with a cumulative sum of the measure per symbol:
+    tick i goes to bar floor(cum_before_i / threshold), so the tick that
+    crosses the threshold completes its bar, and that bar is emitted in the
+    same update(). The running sum is carried across batches relative to
+    the current bar, so it never grows large. Bars are labelled with the
+    time of their last tick (their close time).
+
+    `threshold` is one number for all symbols or a {symbol: threshold}
+    mapping; `default_threshold` covers symbols missing from it.
+    """
+
+    _slot_fields = _BarAggregator._slot_fields + ("_base", "_carry", "_threshold")
+
+    def __init__(self, kind, threshold, default_threshold=None, capacity=16):
+        if kind not in INFO_BAR_KINDS:
+            raise ValueError(f"Unknown bar kind {kind!r}, expected one of {INFO_BAR_KINDS}")
+        self.kind = kind
+        if isinstance(threshold, dict):
+            self.thresholds = dict(threshold)
+            self.default_threshold = default_threshold
+        else:
+            self.thresholds = {}
+            self.default_threshold = threshold
+        self._base = np.zeros(capacity, dtype="int64")
+        self._carry = np.zeros(capacity)
+        self._threshold = np.zeros(capacity)
+        super().__init__(capacity)
+
+    def _new_slot(self, slot, name):
+        super()._new_slot(slot, name)
+        threshold = self.thresholds.get(name, self.default_threshold)
+        if threshold is None or threshold <= 0:
+            raise ValueError(f"No positive {self.kind} bar threshold for {name!r}")
+        self._threshold[slot] = threshold
+
+    def _assign(self, slot, ts, price, qty):
+        if self.kind == "tick":
+            measure = np.ones(len(slot))
+        elif self.kind == "volume":
+            measure = qty
+        else:
+            measure = price * qty
+        # Exclusive running sum per symbol, continuing from the carried part
+        inclusive = np.cumsum(measure)
+        exclusive = inclusive - measure
+        run = np.flatnonzero(_starts(slot))
+        run_len = np.diff(np.append(run, len(slot)))
+        exclusive -= np.repeat(exclusive[run], run_len)
+        inclusive -= np.repeat(inclusive[run] - measure[run], run_len)
+        exclusive += self._carry[slot]
+        inclusive += self._carry[slot]
+
+        threshold = self._threshold[slot]
+        bucket = self._base[slot] + np.floor(exclusive / threshold).astype("int64")
+
+        # Re-anchor the carry on the bar the next tick will start in
+        ends = np.append(run[1:], len(slot)) - 1
+        filled = np.floor(inclusive[ends] / threshold[ends])
+        self._base[slot[ends]] += filled.astype("int64")
+        self._carry[slot[ends]] = inclusive[ends] - filled * threshold[ends]
+        return bucket
+
+    def _completed(self, slots, buckets):
+        return self._base[slots] > buckets
+
+    def _label(self, slots, buckets, last_ts):
+        return last_ts
+
+def info_thresholds(kind, symbols, price, qty, span_ms, bars_per_minute=4):
+    """
+    Per-symbol thresholds that give about `bars_per_minute` bars on average
+    over a sample of ticks spanning `span_ms`.
+    """
+    if kind not in INFO_BAR_KINDS:
+        raise ValueError(f"Unknown bar kind {kind!r}, expected one of {INFO_BAR_KINDS}")
+    measure = {
+        "tick": np.ones(len(price)),
+        "volume": np.asarray(qty, dtype=float),
+        "dollar": np.asarray(price, dtype=float) * np.asarray(qty, dtype=float),
+    }[kind]
+    totals = pd.Series(measure).groupby(np.asarray(symbols, dtype=object)).sum()
+    n_bars = max(span_ms / 60_000 * bars_per_minute, 1.0)
+    return {name: float(total / n_bars) for name, total in totals.items() if total > 0}
+
+class InfoBarStream:
+    """
+    Feeds an InfoBarBuilder from a tick_buffer.TickBuffer across reruns and
+    keeps the bars it closed. Thresholds are sized from the buffer contents
+    on the first refresh and then stay fixed, so earlier bars never change.
+    """
+
+    def __init__(self, kind, bars_per_minute=4):
+        self.kind = kind
+        self.bars_per_minute = bars_per_minute
+        self.builder = None
+        self.position = 0
+        self._bars = ClosedBars.concat([])
+
+    def refresh(self, buffer):
+        """Fold in ticks appended to `buffer` since the last call; returns the closed bars frame."""
+        (ts, symbols, price, qty), self.position = buffer.since(self.position)
+        if self.builder is None:
+            if len(ts) == 0:
+                return self._bars.frame()
+            thresholds = info_thresholds(
+                self.kind, symbols, price, qty, max(int(ts[-1] - ts[0]), 60_000), self.bars_per_minute
+            )
+            self.builder = InfoBarBuilder(self.kind, thresholds, default_threshold=max(thresholds.values()))
+        closed = self.builder.update(ts, symbols, price, qty)
+        bars = ClosedBars.concat([self._bars, closed])
+        if len(bars) and buffer.first_ts is not None:
+            # Same window as the tick buffer
+            keep = bars.ts >= buffer.first_ts
+            bars = ClosedBars(bars.symbol[keep], bars.ts[keep], bars.ohlcv[keep])
+        self._bars = bars
+        return bars.frame()
@@ -0,0 +1,76 @@
+"""
+Streaming bar building vs the pandas resample path on the same ticks.
+
+    python benchmarks/bench_bars.py [n_ticks] [batch_size]
+
+'pandas' is analytics.resample_ohlcv over the whole frame, which is what
+every dashboard refresh paid for a rebuild. 'streaming' feeds
+bars.BarBuilder in batches of `batch_size` ticks, as the writer would
+after each flush, so a refresh only costs one batch. Outputs are checked
+equal.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from analytics import resample_ohlcv
+from bars import BarBuilder, ClosedBars
+
+RULES = ["1s", "1min", "5min"]
+
+def make_ticks(n, seed=7):
+    rng = np.random.default_rng(seed)
+    symbols = np.array(["btcusdt", "ethusdt", "bnbusdt", "solusdt"], dtype=object)
+    ts = 1765875277000 + np.cumsum(rng.integers(0, 20, n))
+    return (
+        ts,
+        symbols[rng.integers(0, len(symbols), n)],
+        86313.42 + np.cumsum(rng.normal(0, 0.5, n)),
+        rng.random(n),
+    )
+
+def run_pandas(df, rule):
+    return resample_ohlcv(df, rule)
+
+def run_streaming(ticks, rule, batch_size):
+    ts, sym, price, qty = ticks
+    builder = BarBuilder(rule)
+    parts = [
+        builder.update(ts[i:i + batch_size], sym[i:i + batch_size], price[i:i + batch_size], qty[i:i + batch_size])
+        for i in range(0, len(ts), batch_size)
+    ]
+    parts.append(builder.open_bars())
+    return ClosedBars.concat(parts).frame()
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    ticks = make_ticks(n)
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(ticks[0], unit="ms", utc=True),
+        "symbol": ticks[1],
+        "price": ticks[2],
+        "qty": ticks[3],
+    })
+    print(f"{n:,} ticks, streaming batches of {batch_size:,}")
+    for rule in RULES:
+        expected, t_pandas = timed(run_pandas, df, rule)
+        got, t_stream = timed(run_streaming, ticks, rule, batch_size)
+        got = got.sort_values(["symbol", "timestamp"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+        per_batch = t_stream / -(-n // batch_size)
+        print(
+            f"{rule:>5}: {len(expected):>8,} bars | pandas {t_pandas:7.3f}s"
+            f" | streaming {t_stream:7.3f}s total ({t_stream / n * 1e6:.2f} us/tick)"
+            f" | per refresh: rebuild {t_pandas * 1e3:8.2f} ms vs {per_batch * 1e3:6.3f} ms"
+        )
@@ -0,0 +1,50 @@
+"""
+Per-message cost of turning a raw trade payload into a storable row.
+
+    python benchmarks/bench_decode.py [n_messages]
+
+'legacy' reproduces the old hot path (pandas Timestamp -> isoformat + dict),
+'decoder' is decoder.decode_trade.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from decoder import decode_trade
+
+def legacy_decode(msg):
+    if msg['e'] == 'trade':
+        return {
+            "timestamp": pd.to_datetime(msg['T'], unit="ms").isoformat(),
+            "symbol": msg['s'].lower(),
+            "price": float(msg['p']),
+            "qty": float(msg['q']),
+        }
+
+def make_messages(n):
+    symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT"]
+    return [
+        {
+            "e": "trade", "E": 1765875277000 + i, "s": symbols[i % 4], "t": 1000 + i,
+            "p": f"{86313.42 + i % 100:.2f}", "q": "0.00080000",
+            "T": 1765875277000 + i, "m": bool(i % 2), "M": True,
+        }
+        for i in range(n)
+    ]
+
+def bench(fn, msgs, repeat=5):
+    best = min(timeit.repeat(lambda: [fn(m) for m in msgs], number=1, repeat=repeat))
+    return best / len(msgs) * 1e6
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    msgs = make_messages(n)
+    legacy = bench(legacy_decode, msgs)
+    fast = bench(decode_trade, msgs)
+    print(f"{n:,} messages")
+    print(f"legacy  : {legacy:8.3f} us/msg")
+    print(f"decoder : {fast:8.3f} us/msg  ({legacy / fast:.1f}x faster)")
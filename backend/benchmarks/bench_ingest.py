@@ -0,0 +1,98 @@
+"""
+Offline ingest throughput benchmark.
+
+Runs ingest_service.start_ingestion_service against ReplayWebsocketManager
+and a throwaway SQLite file, then reports sustained ticks/sec, end-to-end
+latency (send -> commit) percentiles and drops. Rates and latencies count
+only rows the commit actually inserted, not ignored duplicates.
+
+    python benchmarks/bench_ingest.py --rate 1000 10000 100000 --duration 10
+    python benchmarks/bench_ingest.py --source trades.ndjson --flush-interval 0.1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import ingest_service
+from replay import ReplayWebsocketManager, recorded_trades
+from storage import TickWriter, init_db, FLUSH_INTERVAL, FLUSH_SIZE
+from pipeline import QUEUE_SIZE
+
+def run(rate, duration, source=None, flush_interval=FLUSH_INTERVAL, flush_size=FLUSH_SIZE,
+        queue_size=QUEUE_SIZE, policy="drop_oldest"):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="replay_"), "replay.db")
+    init_db(db_path)
+
+    latencies = []
+    # Rows committed while the feed was still running -> sustained rate
+    during_feed = [0]
+
+    def on_insert(rows, symbol_ids, after_id):
+        # rows are (id, ts, symbol_id, price, qty) of the newly inserted ticks
+        now_ms = time.time() * 1000
+        if not manager.done.is_set():
+            during_feed[0] += len(rows)
+        latencies.append(now_ms - np.fromiter((r[1] for r in rows), dtype="float64", count=len(rows)))
+
+    writer = TickWriter(db_path, flush_size=flush_size, flush_interval=flush_interval, on_insert=on_insert)
+    manager = ReplayWebsocketManager(
+        rate=rate, duration=duration, source=recorded_trades(source) if source else None
+    )
+
+    ingest_service.stop_event.clear()
+    result = {}
+    service = threading.Thread(
+        target=lambda: result.update(ingest_service.start_ingestion_service(
+            manager_factory=lambda: manager, writer=writer, maintenance=False,
+            maxsize=queue_size, policy=policy,
+        )),
+        daemon=True,
+    )
+    service.start()
+    manager.join()
+    ingest_service.stop_event.set()
+    service.join()
+
+    lat = np.concatenate(latencies) if latencies else np.empty(0)
+    pct = np.percentile(lat, [50, 95, 99]) if len(lat) else [np.nan] * 3
+    return {
+        "target_rate": rate,
+        "sent": manager.sent,
+        "send_rate": manager.sent / manager.elapsed,
+        "written": writer.rows_written,
+        "ticks_per_sec": during_feed[0] / manager.elapsed,
+        "dropped": result.get("dropped", 0),
+        "max_depth": result.get("max_depth", 0),
+        "p50_ms": pct[0], "p95_ms": pct[1], "p99_ms": pct[2],
+        "max_ms": lat.max() if len(lat) else np.nan,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="msgs/s")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per rate")
+    parser.add_argument("--source", help="NDJSON file of recorded trade payloads (default: synthetic)")
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL)
+    parser.add_argument("--flush-size", type=int, default=FLUSH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--policy", default="drop_oldest")
+    args = parser.parse_args()
+
+    header = f"{'target':>8} {'sent/s':>9} {'ticks/s':>9} {'dropped':>8} {'maxq':>7} {'p50ms':>7} {'p95ms':>7} {'p99ms':>7} {'maxms':>7}"
+    rows = []
+    for rate in args.rate:
+        r = run(rate, args.duration, args.source, args.flush_interval, args.flush_size,
+                args.queue_size, args.policy)
+        rows.append(
+            f"{r['target_rate']:>8,} {r['send_rate']:>9,.0f} {r['ticks_per_sec']:>9,.0f} {r['dropped']:>8,} "
+            f"{r['max_depth']:>7,} {r['p50_ms']:>7.1f} {r['p95_ms']:>7.1f} {r['p99_ms']:>7.1f} {r['max_ms']:>7.1f}"
+        )
+    print(header)
+    print("\n".join(rows))
@@ -0,0 +1,90 @@
+"""
+Cold-start import report.
+
+Imports each entry point's startup modules in a fresh interpreter under
+`python -X importtime` and reports wall time, import time per package (self
+time of all its modules) and which of the known heavy packages got loaded.
+The dashboard target is taken from the module-level imports of main.py, so
+it follows the app as it changes. plotly.graph_objects always shows up for
+the dashboard: streamlit imports it itself, so main.py does not defer it.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --target ingest_service --top 20 --repeat 5
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("pandas", "statsmodels", "scipy", "plotly.graph_objects", "binance")
+
+def startup_imports(path):
+    """Import statements main.py runs before any panel renders (module level, incl. try blocks)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    stmts, todo = [], list(tree.body)
+    while todo:
+        node = todo.pop(0)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            stmts.append(ast.unparse(node))
+        elif isinstance(node, ast.Try):
+            todo[:0] = node.body
+        elif isinstance(node, ast.If):
+            todo[:0] = node.body
+    return "\n".join(stmts)
+
+TARGETS = {
+    "dashboard": startup_imports(os.path.join(BACKEND, "main.py")),
+    "ingest_service": "import ingest_service",
+    "ingest_daemon": "import ingest_daemon",
+}
+
+def measure(code):
+    """Runs `code` in a fresh interpreter; returns (wall seconds, {package: self µs}, heavy loaded)."""
+    probe = (
+        "import time as _t\n_s = _t.perf_counter()\n" + code +
+        "\n_w = _t.perf_counter() - _s\nimport sys as _sys\n"
+        f"print('WALL', _w); print('HEAVY', *(m for m in {HEAVY!r} if m in _sys.modules))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=BACKEND + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    # Run outside the repo, so nothing an import writes to the working directory lands in it
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", probe],
+            cwd=cwd, env=env, capture_output=True, text=True, check=True,
+        )
+    report = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        report[key] = value
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = line[len("import time:"):].split("|", 2)
+        if own.strip().isdigit():
+            root = name.strip().split(".")[0]
+            packages[root] = packages.get(root, 0) + int(own)
+    return float(report["WALL"]), packages, report["HEAVY"].split()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--top", type=int, default=10, help="heaviest packages to list per target")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per target; the fastest is reported")
+    args = parser.parse_args()
+
+    for target in args.target:
+        runs = [measure(TARGETS[target]) for _ in range(args.repeat)]
+        wall, packages, heavy = min(runs, key=lambda r: r[0])
+        print(f"\n{target}: {wall * 1000:,.0f} ms cold import (best of {args.repeat})")
+        print(f"  heavy packages loaded: {', '.join(heavy) or 'none'}")
+        for name, us in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {us / 1000:>9,.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
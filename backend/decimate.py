@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# Points kept per horizontal pixel of chart width
+POINTS_PER_PX = 2
+
+def points_for_width(width_px, per_px=POINTS_PER_PX):
+    """Per-trace point budget for a chart `width_px` wide."""
+    return max(int(width_px * per_px), 3)
+
+def lttb(x, y, n_out):
+    """
+    Largest-triangle-three-buckets: indices of `n_out` points of (x, y) that
+    preserve the visual shape of the line. First and last points are kept;
+    every bucket in between keeps the point forming the largest triangle
+    with the previously kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float) - x[0]
+    y = np.asarray(y, dtype=float)
+
+    # bounds[i]:bounds[i+1] is bucket i; the last bound is the final point
+    bounds = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    sizes = np.diff(np.append(bounds, n))
+    avg_x = np.add.reduceat(x, bounds) / sizes
+    avg_y = np.add.reduceat(y, bounds) / sizes
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def decimate(series, max_points, start=None):
+    """
+    Line series for plotting: NaNs dropped, cut to index >= `start` (the zoom
+    range), then reduced with LTTB to at most `max_points`. Series already
+    within budget come back at full resolution.
+    """
+    series = series.dropna()
+    if start is not None:
+        series = series[series.index >= start]
+    if len(series) <= max_points:
+        return series
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(index))
+    return series.iloc[lttb(x, series.to_numpy(), max_points)]
+
+def sample_rows(frame, max_points, seed=0):
+    """Uniform random subset of at most `max_points` rows, in original order."""
+    if len(frame) <= max_points:
+        return frame
+    rng = np.random.default_rng(seed)
+    return frame.iloc[np.sort(rng.choice(len(frame), max_points, replace=False))]
+
+def histogram(values, bins=30):
+    """Server-side histogram: (bin centers, counts, bin width) of the finite values."""
+    values = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+    return (edges[:-1] + edges[1:]) / 2, counts, np.diff(edges)
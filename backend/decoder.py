@@ -0,0 +1,29 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Raw exchange symbol ("BTCUSDT") -> interned storage symbol ("btcusdt").
+# Avoids a new lowercase string per message.
+_SYMBOLS = {}
+
+def _symbol(raw):
+    sym = _SYMBOLS.get(raw)
+    if sym is None:
+        sym = _SYMBOLS[raw] = raw.lower()
+    return sym
+
+def decode_trade(msg):
+    """
+    Websocket trade payload -> (epoch_ms, symbol, price, qty, trade_id) tuple,
+    the row format TickWriter.write_many takes. Returns None for non-trade events.
+    No pandas and no intermediate dict on this path.
+    """
+    if msg.get("e") != "trade":
+        if msg.get("e") == "error":
+            logger.error(f"WebSocket error message: {msg}")
+        return None
+    return (msg["T"], _symbol(msg["s"]), float(msg["p"]), float(msg["q"]), msg["t"])
+
+def decode_rest_trade(trade, symbol):
+    """REST get_recent_trades / get_historical_trades entry -> same tuple as decode_trade."""
+    return (trade["time"], symbol, float(trade["price"]), float(trade["qty"]), trade["id"])
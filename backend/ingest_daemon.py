@@ -0,0 +1,264 @@
+"""
+Standalone ingestion process.
+
+Exactly one daemon owns the websocket feed and the SQLite writer (enforced by
+a lock file). Committed ticks are also published to a shared-memory ring
+(ringbuffer.TickRing) that dashboard sessions read without touching SQLite.
+Start/stop/status are requests over a local, authenticated socket.
+
+    python ingest_daemon.py                 # run the daemon (idle until "start")
+    python ingest_daemon.py --start         # run it and start the feed right away
+    python ingest_daemon.py --replay 1000   # feed synthetic trades instead of Binance
+    python ingest_daemon.py --send status   # talk to a running daemon (start/stop/status/shutdown)
+"""
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from ringbuffer import TickRing, RING_CAPACITY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ["btcusdt", "ethusdt", "bnbusdt", "solusdt"]
+LOCK_PATH = os.path.join(BASE_DIR, "ingest.lock")
+KEY_PATH = os.path.join(BASE_DIR, ".ingest_key")
+if os.name == "posix":
+    ADDRESS, FAMILY = os.path.join(BASE_DIR, "ingest.sock"), "AF_UNIX"
+else:
+    ADDRESS, FAMILY = r"\\.\pipe\quant_ingest", "AF_PIPE"
+
+def _authkey(create=False):
+    """Shared secret for the control socket, readable by this user only."""
+    try:
+        with open(KEY_PATH, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        if not create:
+            return None
+    key = os.urandom(32)
+    fd = os.open(KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+def acquire_lock(path=LOCK_PATH):
+    """Exclusive, non-blocking lock held for the daemon's lifetime; None if taken."""
+    f = open(path, "a+")
+    try:
+        if os.name == "posix":
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()))
+    f.flush()
+    return f
+
+class IngestDaemon:
+    """
+    Runs ingest_service.start_ingestion_service in a thread of this process,
+    with a TickWriter that publishes every commit to the tick ring.
+    manager_factory is passed through (e.g. a replay manager for offline runs).
+    """
+
+    def __init__(self, ring_capacity=RING_CAPACITY, manager_factory=None):
+        self.ring_capacity = ring_capacity
+        self.manager_factory = manager_factory
+        self.ring = None
+        self.writer = None
+        self.symbols = None
+        self.started_at = None
+        self._thread = None
+        # Each feed gets its own stop event, so a feed that is slow to shut
+        # down can never be revived by the next start()
+        self._stop_event = threading.Event()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stopping(self):
+        """True while a stopped feed's thread is still shutting down."""
+        return self.running() and self._stop_event.is_set()
+
+    def start(self, symbols=None, timeout=10.0):
+        if self.stopping():
+            # Never run two feeds (and two TickWriters) at once
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning("Previous feed is still shutting down; not starting another")
+                return dict(self.status(), error="previous feed is still shutting down")
+        if self.running():
+            return self.status()
+        from ingest_service import start_ingestion_service
+        from storage import TickWriter
+
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self.writer = TickWriter(on_insert=self.ring.publish)
+        self._stop_event = threading.Event()
+        options = {"symbols": self.symbols, "writer": self.writer, "stop_event": self._stop_event}
+        if self.manager_factory is not None:
+            options["manager_factory"] = self.manager_factory
+        self._thread = threading.Thread(
+            target=start_ingestion_service, kwargs=options, daemon=True, name="IngestionThread"
+        )
+        self._thread.start()
+        self.started_at = time.time()
+        logger.info(f"Feed started for {self.symbols}")
+        return self.status()
+
+    def stop(self, timeout=10.0):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                # Keep the thread: start() waits for it instead of starting a second feed
+                logger.warning(f"Feed did not stop within {timeout}s; still shutting down")
+                return self.status()
+            self._thread = None
+            logger.info("Feed stopped")
+        return self.status()
+
+    def status(self):
+        writer = self.writer
+        return {
+            "running": self.running(),
+            "stopping": self.stopping(),
+            "pid": os.getpid(),
+            "symbols": self.symbols,
+            "source": "binance" if self.manager_factory is None else "replay",
+            "started_at": self.started_at,
+            "rows_written": writer.rows_written if writer is not None else 0,
+            "ring": self.ring.stats() if self.ring is not None else None,
+        }
+
+    def serve(self, address=ADDRESS, start=False, symbols=None):
+        """Serve control requests until a shutdown request (or SIGTERM)."""
+        from storage import init_db
+        init_db()
+        self.ring = TickRing.create(capacity=self.ring_capacity)
+        if FAMILY == "AF_UNIX" and os.path.exists(address):
+            # Left by a daemon that died; we hold the lock, so nobody is listening
+            os.unlink(address)
+        listener = Listener(address, family=FAMILY, authkey=_authkey(create=True))
+        logger.info(f"Ingest daemon {os.getpid()} listening on {address}")
+        try:
+            if start:
+                self.start(symbols)
+            while True:
+                try:
+                    with listener.accept() as conn:
+                        request = conn.recv()
+                        reply, done = self.handle(request)
+                        conn.send(reply)
+                except (EOFError, OSError) as e:
+                    # Bad key or a client that went away; keep serving
+                    logger.warning(f"Control request failed: {e}")
+                    continue
+                if done:
+                    break
+        finally:
+            self.stop()
+            listener.close()
+            self.ring.close()
+            logger.info("Ingest daemon exited")
+
+    def handle(self, request):
+        """Returns (reply, shutdown?) for one {"cmd": ...} request."""
+        cmd = request.get("cmd")
+        if cmd == "start":
+            return self.start(request.get("symbols")), False
+        if cmd == "stop":
+            return self.stop(), False
+        if cmd == "status":
+            return self.status(), False
+        if cmd == "shutdown":
+            return self.stop(), True
+        return {"error": f"unknown command {cmd!r}"}, False
+
+def request(cmd, **kwargs):
+    """Send one control request to the daemon. Returns its reply, None if it is not running."""
+    key = _authkey()
+    if key is None:
+        return None
+    try:
+        with Client(ADDRESS, family=FAMILY, authkey=key) as conn:
+            conn.send({"cmd": cmd, **kwargs})
+            return conn.recv()
+    except (OSError, EOFError):
+        return None
+
+def launch(args=(), wait=10.0):
+    """Start the daemon in the background unless one answers already. Returns its status."""
+    status = request("status")
+    if status is not None:
+        return status
+    options = {"start_new_session": True} if os.name == "posix" else {
+        "creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    }
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), *args],
+        cwd=BASE_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        **options,
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.2)
+        status = request("status")
+        if status is not None:
+            return status
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--send", choices=["start", "stop", "status", "shutdown"],
+                        help="send a command to the running daemon and print the reply")
+    parser.add_argument("--start", action="store_true", help="start the feed as soon as the daemon is up")
+    parser.add_argument("--symbols", nargs="+", default=None)
+    parser.add_argument("--replay", type=float, default=None, metavar="RATE",
+                        help="synthetic trades at RATE msgs/s instead of the Binance websocket")
+    parser.add_argument("--capacity", type=int, default=RING_CAPACITY, help="ticks kept in the shared ring")
+    args = parser.parse_args()
+
+    if args.send:
+        kwargs = {"symbols": args.symbols} if args.symbols else {}
+        print(request(args.send, **kwargs))
+        return
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
+    lock = acquire_lock()
+    if lock is None:
+        print(f"Another ingest daemon holds {LOCK_PATH}; not starting")
+        sys.exit(1)
+
+    factory = None
+    if args.replay:
+        from replay import ReplayWebsocketManager
+        factory = lambda: ReplayWebsocketManager(rate=args.replay, duration=float("inf"))
+
+    # SIGTERM unwinds through serve()'s cleanup like Ctrl-C does
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        IngestDaemon(args.capacity, factory).serve(start=args.start, symbols=args.symbols)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        lock.close()
+
+if __name__ == "__main__":
+    main()
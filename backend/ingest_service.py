@@ -1,52 +1,63 @@
 from binance import ThreadedWebsocketManager
-from storage import insert_tick
+from storage import TickWriter
+from retention import start_maintenance
+from pipeline import IngestPipeline
+from decoder import decode_trade
 import logging
 import time
-import pandas as pd
 import threading
 
-# Configure logging
 from datetime import datetime
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-    handlers=[
-        logging.FileHandler(f'analytics_ingest_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
-)
+
 logger = logging.getLogger(__name__)
 
-# Global stop event for graceful shutdown
+def configure_logging():
+    """Console plus a daily log file in the working directory, for the standalone service."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
+        handlers=[
+            logging.FileHandler(f'analytics_ingest_{datetime.now().strftime("%Y%m%d")}.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+# Global stop event for graceful shutdown, used when the caller passes none
 stop_event = threading.Event()
+_global_stop = stop_event
+
+# How often queue depth / drop counters are logged
+STATS_INTERVAL = 30
 
-def start_ingestion_service():
+def start_ingestion_service(symbols=None, manager_factory=ThreadedWebsocketManager,
+                            writer=None, maintenance=True, stop_event=None, **pipeline_options):
     """
     Dedicated ingestion service using WebSocket Streams.
     This avoids rate limits and IP bans from REST API polling.
-    Now supports graceful shutdown via stop_event.
+    Runs until stop_event is set (the module-level stop_event by default).
+    manager_factory / writer can be swapped for offline replay (see replay.py).
+    Returns the final pipeline counters.
     """
-    symbols = ["btcusdt", "ethusdt", "bnbusdt", "solusdt"]
+    if stop_event is None:
+        stop_event = _global_stop
+    symbols = symbols or ["btcusdt", "ethusdt", "bnbusdt", "solusdt"]
     
     logging.info(f"🚀 Ingestion Service Started (WebSocket Mode) for: {symbols}")
 
-    def handle_trade_message(msg):
-        """Callback for trade messages"""
-        try:
-            if msg['e'] == 'trade':
-                insert_tick({
-                    "timestamp": pd.to_datetime(msg['T'], unit="ms").isoformat(),
-                    "symbol": msg['s'].lower(),
-                    "price": float(msg['p']),
-                    "qty": float(msg['q']),
-                })
-                logging.debug(f"Inserted tick for {msg['s']}")
-        except Exception as e:
-            logging.error(f"Error processing trade message: {e}")
+    # One long-lived connection, batched commits instead of one per trade
+    writer = writer or TickWriter()
+    if maintenance:
+        # Archive / roll up / prune old data in the background so the DB stays bounded
+        start_maintenance(stop_event)
+
+    # The socket callback only enqueues; decoding and DB writes happen on
+    # the pipeline's writer thread so a DB stall never blocks socket reads
+    pipeline = IngestPipeline(writer, decode_trade, **pipeline_options).start()
+    handle_trade_message = pipeline.submit
 
     try:
         # Create WebSocket manager
-        twm = ThreadedWebsocketManager()
+        twm = manager_factory()
         twm.start()
         
         # Subscribe to trade streams for all symbols
@@ -55,8 +66,12 @@ def start_ingestion_service():
             logging.info(f"Subscribed to {symbol} trade stream")
         
         # Keep running until stop event is set
+        last_stats = time.monotonic()
         while not stop_event.is_set():
             time.sleep(1)
+            if time.monotonic() - last_stats >= STATS_INTERVAL:
+                logging.info(f"Ingest pipeline: {pipeline.stats()}")
+                last_stats = time.monotonic()
         
         # Cleanup
         logging.info("Stopping WebSocket streams...")
@@ -67,8 +82,17 @@ def start_ingestion_service():
     except Exception as e:
         logging.error(f"WebSocket error: {e}")
     finally:
+        # Drain the queue completely before the writer's last flush, so the
+        # writer thread never writes to a closed writer
+        pipeline.stop()
+        writer.close()
         logging.info("Ingestion Service Stopped")
 
+    return pipeline.stats()
+
 if __name__ == "__main__":
+    # Only when run as a script: importing this module (daemon, benchmarks)
+    # must not leave log files in the caller's working directory
+    configure_logging()
     start_ingestion_service()
 
@@ -1,41 +1,30 @@
 from binance.client import Client
-from storage import insert_tick
-import pandas as pd
-import time
+from storage import TickWriter
+from backfill import BackfillEngine
+import threading
 
-def start_binance_feed(symbols):
+def start_binance_feed(symbols, stop_event=None, client=None):
     """
     Robust data ingestion using REST Polling (HTTP).
     This avoids WebSocket instability/reactor issues in Streamlit threads.
+    Symbols are polled concurrently and any trade-id gaps between polls are
+    backfilled (see backfill.BackfillEngine), so bursts are not lost.
+    Runs until stop_event is set (e.g. ingest_service.stop_event).
     """
-    client = Client()
-    print("✅ Feed started (Polling Mode)")
-
-    # Keep track of the last trade ID processed to avoid duplicates
-    last_trade_ids = {s: 0 for s in symbols}
+    if stop_event is None:
+        stop_event = threading.Event()
 
-    while True:
-        try:
-            for s in symbols:
-                # Fetch recent trades (snapshot)
-                trades = client.get_recent_trades(symbol=s.upper(), limit=10)
-                
-                for t in trades:
-                    tid = t["id"]
-                    if tid > last_trade_ids[s]:
-                        # New trade found
-                        insert_tick({
-                            "timestamp": pd.to_datetime(t["time"], unit="ms").isoformat(),
-                            "symbol": s.lower(),
-                            "price": float(t["price"]),
-                            "qty": float(t["qty"]),
-                        })
-                        last_trade_ids[s] = tid
-            
-            # Rate limit compliance (polled every 1s approx)
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"❌ Polling error: {e}")
-            time.sleep(2)
+    client = client or Client()
+    writer = TickWriter()
+    engine = BackfillEngine(client, writer, symbols)
+    print("✅ Feed started (Polling Mode)")
 
+    try:
+        # Rate limit compliance is handled by the engine's limiter
+        engine.run(stop_event, interval=1)
+    except Exception as e:
+        print(f"❌ Polling error: {e}")
+    finally:
+        # Flush the last partial batch before returning
+        writer.close()
+        print("⏹ Feed stopped")
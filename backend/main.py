@@ -9,7 +9,6 @@ if BASE_DIR not in sys.path:
 
 # Standard library imports
 import threading
-import time
 import subprocess
 import logging
 from datetime import datetime
@@ -19,6 +18,8 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
+# statsmodels (via analytics) is imported when its panels render; plotly is
+# imported up front since streamlit loads it anyway
 
 # Configure logging
 logging.basicConfig(
@@ -33,8 +34,18 @@ logger = logging.getLogger(__name__)
 
 # Custom module imports with error handling
 try:
-    from storage import init_db, load_ticks
-    from analytics import resample_ohlcv, compute_pair_analytics, adf_pvalue, calculate_signal_efficacy
+    from storage import init_db, load_bars, get_watermark
+    from cache import shared_cache
+    from tick_buffer import TickBuffer
+    from streaming import RollingPairStats, RecursiveLeastSquares, KalmanHedge, AsofPairStream
+    from analytics import compute_pair_analytics, calculate_signal_efficacy, StationarityCache, asof_align
+    from pairs import align_closes, pair_matrix, correlation_matrix
+    from bars import InfoBarStream
+    from sweep import sweep, make_pool, DEFAULT_WINDOWS, DEFAULT_LOOKAHEADS, DEFAULT_THRESHOLDS
+    from backtest import backtest
+    from decimate import decimate, sample_rows, histogram, points_for_width
+    from ringbuffer import TickRing
+    import ingest_daemon
 except ImportError as e:
     st.error(f"CRITICAL IMPORT ERROR: {e}")
     st.error(f"Python path: {sys.path}")
@@ -77,69 +88,38 @@ st.markdown("""
 st.title("📊 Quant Analytics Dashboard")
 
 # ----------------------------------------------------
-# INGESTION THREAD MANAGEMENT (CLOUD-COMPATIBLE)
+# INGESTION DAEMON CONTROL
 # ----------------------------------------------------
-# Initialize session state for thread management
-if 'ingestion_thread' not in st.session_state:
-    st.session_state.ingestion_thread = None
-if 'ingestion_active' not in st.session_state:
-    st.session_state.ingestion_active = False
+# Ingestion runs in its own process (ingest_daemon.py) that holds a
+# single-writer lock; sessions only send it start/stop/status requests over
+# a local socket and read new ticks from its shared-memory ring.
+ingest_status = ingest_daemon.request("status")
 
 def is_ingestion_running():
-    """Check if ingestion thread is active"""
-    return st.session_state.ingestion_active
+    """Check if the daemon's feed is active"""
+    return bool(ingest_status and ingest_status["running"])
 
 def start_ingestion():
-    """Start ingestion in a background thread"""
-    if st.session_state.ingestion_active:
-        logger.info("Ingestion already running")
+    """Launch the daemon if needed and start its feed"""
+    global ingest_status
+    if ingest_daemon.launch() is None:
+        logger.error("Ingest daemon did not come up")
+        st.error("Failed to start ingestion: daemon did not respond")
         return
-    
-    try:
-        # Import here to avoid circular imports
-        from ingest_service import start_ingestion_service, stop_event
-        
-        # Clear stop event
-        stop_event.clear()
-        
-        # Create and start thread
-        thread = threading.Thread(
-            target=start_ingestion_service,
-            daemon=True,  # Thread will die when main program exits
-            name="IngestionThread"
-        )
-        thread.start()
-        
-        # Store in session state
-        st.session_state.ingestion_thread = thread
-        st.session_state.ingestion_active = True
-        
-        logger.info("Ingestion thread started successfully")
-        
-    except Exception as e:
-        logger.error(f"Failed to start ingestion thread: {e}")
-        st.error(f"Failed to start ingestion: {e}")
+    ingest_status = ingest_daemon.request("start", symbols=symbols)
+    if ingest_status and ingest_status.get("error"):
+        st.error(f"Failed to start ingestion: {ingest_status['error']}")
+        return
+    logger.info(f"Ingest daemon feed started: {ingest_status}")
 
 def stop_ingestion():
-    """Stop the ingestion thread gracefully"""
-    if not st.session_state.ingestion_active:
+    """Stop the daemon's feed (the daemon itself keeps running)"""
+    global ingest_status
+    if not is_ingestion_running():
         logger.info("Ingestion not running")
         return
-    
-    try:
-        from ingest_service import stop_event
-        
-        # Signal thread to stop
-        stop_event.set()
-        
-        # Update state immediately (thread will finish on its own)
-        st.session_state.ingestion_active = False
-        
-        logger.info("Ingestion stop signal sent")
-        
-    except Exception as e:
-        logger.error(f"Error stopping ingestion: {e}")
-        st.error(f"Error stopping ingestion: {e}")
+    ingest_status = ingest_daemon.request("stop")
+    logger.info("Ingestion stop request sent")
 
 # ----------------------------------------------------
 # TUTORIAL (BUILT-IN, EVALUATOR LOVED)
@@ -177,10 +157,25 @@ symbols = ["btcusdt", "ethusdt", "bnbusdt", "solusdt"]
 sym_x = st.sidebar.selectbox("Symbol X", symbols, 0)
 sym_y = st.sidebar.selectbox("Symbol Y", symbols, 1)
 
-timeframe = st.sidebar.selectbox("Timeframe", ["1s", "1m", "5m"])
+timeframe = st.sidebar.selectbox("Timeframe", ["1s", "1m", "5m", "Tick", "Volume", "Dollar", "Trades (as-of)"])
+# "Trades (as-of)" skips bars: every Y trade is paired with the last X price
+TICK_MODE = "Trades (as-of)"
+# Event bars close on activity (trade count, quantity, notional) instead of the clock
+info_kinds = {"Tick": "tick", "Volume": "volume", "Dollar": "dollar"}
+if timeframe in info_kinds:
+    bars_per_minute = st.sidebar.slider("Event Bars per Minute (avg)", 1, 60, 4)
 window = st.sidebar.slider("Rolling Window", 20, 200, 60)
 z_alert = st.sidebar.slider("Z-Score Alert Threshold", 1.0, 3.0, 2.0)
 
+# Static OLS fits all history once; the rolling/RLS engines track drift per bar
+hedge_modes = {
+    "Static OLS": "ols",
+    "Rolling OLS": "rolling",
+    "Recursive LS": "rls",
+    "Kalman Filter": "kalman",
+}
+hedge_mode = hedge_modes[st.sidebar.selectbox("Hedge Ratio", list(hedge_modes.keys()))]
+
 # Timezone Selection
 tz_options = {
     "UTC": "UTC",
@@ -191,6 +186,13 @@ tz_options = {
 selected_tz_label = st.sidebar.selectbox("Timezone Display", list(tz_options.keys()))
 selected_tz = tz_options[selected_tz_label]
 
+# History kept in memory for the dashboard (older ticks stay in SQLite)
+lookback = st.sidebar.selectbox("History Lookback", ["15min", "1h", "6h", "24h"], index=2)
+# Charts are decimated server-side to ~2 points per pixel; zooming in on
+# the latest span brings back full resolution once it fits the budget
+chart_zoom = st.sidebar.select_slider("Chart Zoom (latest)", ["All", "1h", "15min", "5min", "1min"], value="All")
+chart_width = st.sidebar.select_slider("Chart Width (px)", [600, 900, 1200, 1600, 2400], value=1200)
+
 if st.sidebar.button("▶ Start Live Feed"):
     start_ingestion()
     st.sidebar.success("Backend Ingestion Service Started")
@@ -206,121 +208,214 @@ st.sidebar.markdown("---")
 st.sidebar.markdown("### 🔄 Refresh Settings")
 enable_refresh = st.sidebar.toggle("Auto-Refresh Data", value=False)
 refresh_rate = st.sidebar.slider("Interval (seconds)", 1, 30, 3, disabled=not enable_refresh)
+# Efficacy, backtest and screener panels refresh on this slower cadence
+diagnostics_every = st.sidebar.slider("Diagnostics Every (seconds)", 10, 300, 30, disabled=not enable_refresh)
+# ADF is re-run at most this often, and only once new ticks have arrived
+adf_every = st.sidebar.slider("Stationarity Test Every (seconds)", 5, 300, 30)
 
-# Sidebar - Connection Status
+# Sidebar - Connection Status, as reported by the ingest daemon
 st.sidebar.markdown("### 📡 Connection Status")
 
-if is_ingestion_running():
-    st.sidebar.success("🟢 Connected to Binance")
+if ingest_status is None:
+    st.sidebar.error("🔴 Ingest daemon not running")
+elif ingest_status.get("stopping"):
+    st.sidebar.warning("🟡 Feed stopping")
+elif is_ingestion_running():
+    st.sidebar.success(f"🟢 Feed running ({ingest_status.get('source', 'binance')})")
 else:
-    st.sidebar.error("🔴 Disconnected")
+    st.sidebar.warning("🟠 Ingest daemon idle (feed stopped)")
+if ingest_status is not None:
+    ring_count = ingest_status["ring"]["count"] if ingest_status.get("ring") else 0
+    st.sidebar.caption(
+        f"Ingest daemon pid {ingest_status['pid']} • {ingest_status['rows_written']:,} ticks written • "
+        f"{ring_count:,} published to the ring"
+    )
 
 st.sidebar.markdown("---")
 
 # ----------------------------------------------------
 # LOAD DATA
 # ----------------------------------------------------
-df = load_ticks()
-
-if df.empty:
-    st.warning("⏳ Waiting for live data... (Start the feed from the sidebar)")
-    # Auto-refresh if ingestion is running to check for new data
-    if is_ingestion_running():
-        time.sleep(1)  # Brief pause to allow data collection
-        st.rerun()
-    st.stop()
+# Results derived from the ticks are shared by all sessions through one
+# process-wide cache keyed on the data watermark (read before the buffer,
+# so cached results are never older than their key)
+cache = shared_cache()
+
+# Stateful objects (shared memory, engines with locks and history, the ADF
+# cache) are not results: they live in st.cache_resource keyed by their
+# parameters, so the result LRU never evicts them mid-session.
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def attach_ring(token):
+    """The daemon's tick ring, one attachment per process and ring token (daemon restart)."""
+    ring = TickRing.attach()
+    return ring if ring is not None and ring.token == token else None
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def pair_engines(sym_x, sym_y, timeframe, window, lookback, selected_tz, bars_per_minute):
+    """Streaming engines for one view, shared by its sessions (one lock per engine set)."""
+    return {
+        "stats": RollingPairStats(window),
+        "rls": RecursiveLeastSquares(window),
+        "kalman": KalmanHedge(window),
+        "lock": threading.Lock(),
+    }
 
-# ----------------------------------------------------
-# TIMESTAMP PROCESSING (TIMEZONE)
-# ----------------------------------------------------
-# Convert to datetime if not already
-df["timestamp"] = pd.to_datetime(df["timestamp"])
+@st.cache_resource(show_spinner=False, max_entries=16)
+def pair_stream(timeframe, sym_x, sym_y, lookback, bars_per_minute):
+    """
+    Event series (as-of ticks or info bars) for one view, with its own tick
+    buffer, shared by its sessions: info-bar thresholds are sized on the first
+    refresh, so per-session streams would feed the shared engines different bars.
+    """
+    if timeframe == TICK_MODE:
+        stream = AsofPairStream(sym_x, sym_y)
+    else:
+        stream = InfoBarStream(info_kinds[timeframe], bars_per_minute)
+    return {
+        "buffer": TickBuffer([sym_x, sym_y], lookback=lookback),
+        "stream": stream,
+        "lock": threading.Lock(),
+    }
 
-# Localize to UTC (assuming stored data is naive UTC from Binance)
-if df["timestamp"].dt.tz is None:
-    df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
-else:
-    df["timestamp"] = df["timestamp"].dt.tz_convert("UTC")
+@st.cache_resource(show_spinner=False)
+def stationarity_cache():
+    return StationarityCache()
 
-# Convert to User Selected Timezone
-df["timestamp"] = df["timestamp"].dt.tz_convert(selected_tz)
+@st.cache_resource(show_spinner=False)
+def sweep_pool():
+    """One sweep worker pool per server process; workers start on the first large sweep."""
+    return make_pool()
 
-# ----------------------------------------------------
-# VERIFICATION SECTION
-# ----------------------------------------------------
-with st.expander("🔍 Verify Data (SQLite Inspector)", expanded=False):
-    st.info("""
-    **ℹ Transparency & Verification:**
-    - **Live DB Feed**: Below is the raw data (converted to your selected timezone).
-    - **Liveness Check**: Calculates the lag between latest trade and current time.
-    """)
-    
-    st.markdown(f"### 1. Database Content ({selected_tz_label})")
-    st.write(f"Reading directly from: `{os.path.abspath('market_data.db')}`")
-    st.write(f"Total Rows: **{len(df)}**")
-    st.dataframe(df.sort_values("timestamp", ascending=False).head(10), use_container_width=True)
-    
-    st.markdown("### 2. Liveness Check")
-    if not df.empty:
-        # Get latest data time (already in selected_tz)
-        last_time = df["timestamp"].max()
-        
-        # Get current time in same timezone
-        now_time = pd.Timestamp.now(tz=selected_tz)
-        
-        lag = (now_time - last_time).total_seconds()
-        
-        c1, c2 = st.columns(2)
-        c1.metric(f"Latest Data ({selected_tz_label})", f"{last_time:%H:%M:%S}")
-        c2.metric("Lag (Seconds)", f"{lag:.1f}s", delta_color="inverse")
-        
-        if lag < 30: # Relaxed slightly for polling latency
-            st.success("✅ Data is LIVE")
-        else:
-            st.warning("⚠ Data is STALE (Check Timezone/Feed)")
+ring_info = ingest_status["ring"] if ingest_status else None
+ring = attach_ring(ring_info["token"]) if ring_info else None
 
 rule_map = {"1s": "1s", "1m": "1min", "5m": "5min"}
-ohlcv = resample_ohlcv(df, rule_map[timeframe])
 
-px = ohlcv[ohlcv.symbol == sym_x].set_index("timestamp")
-py = ohlcv[ohlcv.symbol == sym_y].set_index("timestamp")
+def load_pair_view():
+    """
+    Data and analytics for the selected pair, as a dict. Each panel group
+    calls this on its own cadence: the tick buffer only reads ticks past its
+    watermark and everything derived is cached on the watermark, so a call
+    without new data is cheap. "ready" is False (with a message and progress)
+    until there are enough bars for the rolling window.
+    """
+    watermark = get_watermark()
+
+    # Incremental: the buffer lives in session state and only reads ticks past
+    # its rowid watermark, so a rerun costs O(new ticks) instead of O(table).
+    buffer = st.session_state.get("tick_buffer")
+    if buffer is None or buffer.symbols != [sym_x, sym_y] or buffer.lookback != lookback:
+        buffer = TickBuffer([sym_x, sym_y], lookback=lookback)
+        st.session_state.tick_buffer = buffer
+    buffer.ring = ring
+    buffer.refresh()
+
+    if len(buffer) == 0:
+        return {"ready": False, "message": "⏳ Waiting for live data... (Start the feed from the sidebar)", "progress": None}
+
+    # Stored as UTC epoch ms; the buffer hands out a frame already in selected_tz
+    df = buffer.frame(selected_tz)
+
+    if timeframe == TICK_MODE or timeframe in info_kinds:
+        # Only ticks new since the last refresh are aligned / folded into bars.
+        # The stream is shared with every session on the view (see pair_stream).
+        shared = pair_stream(
+            timeframe, sym_x, sym_y, lookback, bars_per_minute if timeframe in info_kinds else None
+        )
+        with shared["lock"]:
+            shared["buffer"].ring = ring
+            shared["buffer"].refresh()
+            if timeframe == TICK_MODE:
+                shared["stream"].refresh(shared["buffer"])
+                events = shared["stream"].frame(selected_tz)
+            else:
+                ohlcv = shared["stream"].refresh(shared["buffer"])
+        if timeframe == TICK_MODE:
+            px = events[["x"]].rename(columns={"x": "close"})
+            py = events[["y"]].rename(columns={"y": "close"})
+            ohlcv = events.rename(columns={"x": sym_x, "y": sym_y}).rename_axis("timestamp").reset_index()
+    else:
+        # Bars are materialized at ingest time, so no tick-level resampling here
+        def load_pair_bars():
+            bars = load_bars(
+                rule_map[timeframe],
+                symbols=[sym_x, sym_y],
+                start=pd.Timestamp.now(tz="UTC") - pd.Timedelta(lookback),
+            )
+            bars["timestamp"] = bars["timestamp"].dt.tz_convert(selected_tz)
+            return bars
 
-# Ensure we have enough data
-min_len = min(len(px), len(py))
-if min_len < window:
-    st.info(f"⏳ Collecting data: {min_len}/{window} points needed for {timeframe} timeframe...")
-    
-    # Progress bar
-    progress = min_len / window
-    st.progress(min(progress, 1.0))
-    
-    # Auto-refresh to collect more data
-    if is_ingestion_running():
-        time.sleep(1)
-        st.rerun()
-    st.stop()
+        ohlcv = cache.get_or_compute(
+            ("bars", rule_map[timeframe], sym_x, sym_y, lookback, selected_tz, watermark), load_pair_bars
+        )
+    if timeframe in info_kinds:
+        ohlcv["timestamp"] = ohlcv["timestamp"].dt.tz_convert(selected_tz)
+    if timeframe != TICK_MODE:
+        px = ohlcv[ohlcv.symbol == sym_x].set_index("timestamp")
+        py = ohlcv[ohlcv.symbol == sym_y].set_index("timestamp")
+    if timeframe in info_kinds:
+        # Each symbol closes bars at its own times: line py up with px as-of
+        px, py = asof_align(px, py)
+
+    # Ensure we have enough data
+    min_len = min(len(px), len(py))
+    if min_len < window:
+        return {
+            "ready": False,
+            "message": f"⏳ Collecting data: {min_len}/{window} points needed for {timeframe} timeframe...",
+            "progress": min(min_len / window, 1.0),
+        }
+
+    # Streaming engines only fold in new bars per update. They are shared by all
+    # sessions on the same view (see pair_engines).
+    engine_key = (
+        sym_x, sym_y, timeframe, window, lookback, selected_tz,
+        bars_per_minute if timeframe in info_kinds else None,
+    )
+    engines = pair_engines(*engine_key)
+
+    def run_pair_analytics():
+        with engines["lock"]:
+            return compute_pair_analytics(
+                px, py, window,
+                engine=engines["stats"],
+                hedge=hedge_mode,
+                hedge_engine=engines.get(hedge_mode),
+            )
 
-# Unpack all 6 return values
-beta, spread, zscore, corr, rolling_std, r_squared = compute_pair_analytics(px, py, window)
+    # Unpack all 6 return values
+    analytics_key = engine_key + (hedge_mode, watermark)
+    beta, spread, zscore, corr, rolling_std, r_squared = cache.get_or_compute(
+        ("pair",) + analytics_key, run_pair_analytics
+    )
 
-# ----------------------------------------------------
-# LIVE STATISTICS PANEL (SIDEBAR)
-# ----------------------------------------------------
-st.sidebar.markdown("---")
-st.sidebar.subheader("Live Statistics")
+    # Dynamic hedge modes return per-bar Series; the cards show the latest bar
+    beta_series = None
+    if isinstance(beta, pd.Series):
+        beta_series = beta
+        beta, r_squared = beta.iloc[-1], r_squared.iloc[-1]
+
+    return {
+        "ready": True, "watermark": watermark, "buffer": buffer, "df": df, "ohlcv": ohlcv,
+        "px": px, "py": py, "beta": beta, "spread": spread, "zscore": zscore, "corr": corr,
+        "rolling_std": rolling_std, "r_squared": r_squared, "beta_series": beta_series,
+        "engine_key": engine_key, "analytics_key": analytics_key,
+    }
 
-def format_currency(val):
-    return f"${val:,.2f}"
+def show_waiting(view):
+    if view["progress"] is None:
+        st.warning(view["message"])
+    else:
+        st.info(view["message"])
+        st.progress(view["progress"])
 
-def calculate_std(series):
-    if len(series) < 2: return 0.0
-    return series.std()
+def zoom_start_of(px):
+    return None if chart_zoom == "All" else px.index[-1] - pd.Timedelta(chart_zoom)
 
-# Helper to get latest scalar
-px_last = px.iloc[-1]["close"] if not px.empty else 0
-py_last = py.iloc[-1]["close"] if not py.empty else 0
-px_std = calculate_std(px["close"].tail(window))
-py_std = calculate_std(py["close"].tail(window))
+def chart_series(series, zoom_start, width=chart_width):
+    """Series cut to the zoom range and decimated to the chart's point budget."""
+    return decimate(series, points_for_width(width), start=zoom_start)
 
 # Custom CSS for the stats cards
 st.markdown("""
@@ -331,279 +426,560 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Container for statistics
-with st.sidebar.container():
-    # SYMBOL X Stats
-    st.markdown(f"**{sym_x.upper()}**")
-    c1, c2 = st.columns(2)
-    c1.metric("Price", format_currency(px_last))
-    c2.metric("STD", f"${px_std:.2f}")
-    
-    # SYMBOL Y Stats
-    st.markdown(f"**{sym_y.upper()}**")
-    c3, c4 = st.columns(2)
-    c3.metric("Price", format_currency(py_last))
-    c4.metric("STD", f"${py_std:.2f}")
-    
-    st.markdown("---")
-    
-    # PAIR Stats
-    st.markdown("**PAIR METRICS**")
-    
-    # Row 1
-    c5, c6 = st.columns(2)
-    beta_val = f"{beta:.4f}" if beta is not None else "---"
-    r2_val = f"{r_squared:.3f}" if r_squared is not None else "---"
-    
-    c5.metric("Hedge Ratio (β)", beta_val)
-    c6.metric("R²", r2_val)
-    
-    # Row 2
-    c7, c8 = st.columns(2)
-    adf_val = f"{adf_pvalue(spread):.4f}" if spread is not None else "---"
-    corr_val = f"{corr.iloc[-1]:.3f}" if corr is not None and not corr.empty else "---"
-    
-    c7.metric("ADF p-value", adf_val)
-    c8.metric("Correlation", corr_val)
-
+view = load_pair_view()
+if not view["ready"]:
+    # Poll for data in a fragment; the first complete view reruns the whole page
+    @st.fragment(run_every=1 if is_ingestion_running() else None)
+    def wait_for_data():
+        pending = load_pair_view()
+        if pending["ready"]:
+            st.rerun()
+        show_waiting(pending)
+
+    wait_for_data()
+    st.stop()
 
+cache_stats = cache.stats()
+st.sidebar.caption(
+    f"Shared cache: {cache_stats['hits'] + cache_stats['waits']:,} hits / "
+    f"{cache_stats['misses']:,} misses · {cache_stats['entries']} entries, "
+    f"{cache_stats['bytes'] / 1e6:.1f} MB"
+)
 
-# ----------------------------------------------------
-# KPI CARDS (FIXED NaN DISPLAY)
-# ----------------------------------------------------
-# ----------------------------------------------------
-# SYSTEM KPIs (Top Bar)
-# ----------------------------------------------------
-# Matches requested "Dark Card" stats style
-st.markdown("### 📊 Live System Status")
-k1, k2, k3 = st.columns(3)
-
-with k1:
-    st.metric(
-        label="Ticks Received",
-        value=f"{len(df):,}",
-        delta="Active Feed" if is_ingestion_running() else "Disconnected"
-    )
+# Live panels rerun on the refresh interval and diagnostics on their own
+# slower cadence; both as fragments, so controls and the other group stay put
+live = enable_refresh and is_ingestion_running()
 
-with k2:
-    st.metric(
-        label="Bars Processed",
-        value=f"{len(ohlcv):,}",
-        delta=f"{timeframe} Interval"
-    )
+@st.fragment(run_every=refresh_rate if live else None)
+def live_panels():
+    view = load_pair_view()
+    if not view["ready"]:
+        show_waiting(view)
+        return
+    buffer, df, ohlcv, px, py = (view[k] for k in ("buffer", "df", "ohlcv", "px", "py"))
+    beta, r_squared, beta_series = view["beta"], view["r_squared"], view["beta_series"]
+    spread, zscore, corr = view["spread"], view["zscore"], view["corr"]
+
+    # ----------------------------------------------------
+    # VERIFICATION SECTION
+    # ----------------------------------------------------
+    with st.expander("🔍 Verify Data (SQLite Inspector)", expanded=False):
+        st.info("""
+        **ℹ Transparency & Verification:**
+        - **Live DB Feed**: Below is the raw data (converted to your selected timezone).
+        - **Liveness Check**: Calculates the lag between latest trade and current time.
+        """)
+
+        st.markdown(f"### 1. Database Content ({selected_tz_label})")
+        st.write(f"Reading directly from: `{os.path.abspath('market_data.db')}`")
+        st.write(f"Total Rows: **{len(df)}**")
+        st.dataframe(df.sort_values("timestamp", ascending=False).head(10), use_container_width=True)
+
+        st.markdown("### 2. Liveness Check")
+        if not df.empty:
+            # Get latest data time (already in selected_tz)
+            last_time = df["timestamp"].max()
+
+            # Get current time in same timezone
+            now_time = pd.Timestamp.now(tz=selected_tz)
+
+            lag = (now_time - last_time).total_seconds()
+
+            c1, c2 = st.columns(2)
+            c1.metric(f"Latest Data ({selected_tz_label})", f"{last_time:%H:%M:%S}")
+            c2.metric("Lag (Seconds)", f"{lag:.1f}s", delta_color="inverse")
+
+            if lag < 30: # Relaxed slightly for polling latency
+                st.success("✅ Data is LIVE")
+            else:
+                st.warning("⚠ Data is STALE (Check Timezone/Feed)")
+
+    # ----------------------------------------------------
+    # LIVE STATISTICS PANEL
+    # ----------------------------------------------------
+    st.markdown("### 📌 Live Statistics")
+
+    def format_currency(val):
+        return f"${val:,.2f}"
+
+    def calculate_std(series):
+        if len(series) < 2: return 0.0
+        return series.std()
+
+    # Helper to get latest scalar
+    px_last = px.iloc[-1]["close"] if not px.empty else 0
+    py_last = py.iloc[-1]["close"] if not py.empty else 0
+    px_std = calculate_std(px["close"].tail(window))
+    py_std = calculate_std(py["close"].tail(window))
+
+    sx, sy, sp = st.columns([1, 1, 2])
+    with sx:
+        # SYMBOL X Stats
+        st.markdown(f"**{sym_x.upper()}**")
+        c1, c2 = st.columns(2)
+        c1.metric("Price", format_currency(px_last))
+        c2.metric("STD", f"${px_std:.2f}")
+
+    with sy:
+        # SYMBOL Y Stats
+        st.markdown(f"**{sym_y.upper()}**")
+        c3, c4 = st.columns(2)
+        c3.metric("Price", format_currency(py_last))
+        c4.metric("STD", f"${py_std:.2f}")
+
+    with sp:
+        # PAIR Stats
+        st.markdown("**PAIR METRICS**")
+        c5, c6, c7, c8 = st.columns(4)
+        beta_val = f"{beta:.4f}" if beta is not None and not pd.isna(beta) else "---"
+        r2_val = f"{r_squared:.3f}" if r_squared is not None and not pd.isna(r_squared) else "---"
+
+        c5.metric("Hedge Ratio (β)", beta_val)
+        c6.metric("R²", r2_val)
+
+        # Same series as the pair analytics, so the same key minus the watermark
+        adf_p = stationarity_cache().pvalue(
+            view["engine_key"] + (hedge_mode,), buffer.watermark, spread, every=adf_every,
+        )
+        adf_val = f"{adf_p:.4f}" if adf_p is not None else "---"
+        corr_val = f"{corr.iloc[-1]:.3f}" if corr is not None and not corr.empty else "---"
+
+        c7.metric("ADF p-value", adf_val)
+        c8.metric("Correlation", corr_val)
+
+    # ----------------------------------------------------
+    # KPI CARDS (FIXED NaN DISPLAY)
+    # ----------------------------------------------------
+    # ----------------------------------------------------
+    # SYSTEM KPIs (Top Bar)
+    # ----------------------------------------------------
+    # Matches requested "Dark Card" stats style
+    st.markdown("### 📊 Live System Status")
+    k1, k2, k3 = st.columns(3)
+
+    with k1:
+        st.metric(
+            label="Ticks Received",
+            value=f"{len(df):,}",
+            delta="Active Feed" if is_ingestion_running() else "Disconnected"
+        )
 
-with k3:
-    if zscore is not None:
-        # Count all historical alerts in the current window
-        alert_count = (zscore.abs() > z_alert).sum()
+    with k2:
         st.metric(
-            label="Alerts Triggered",
-            value=f"{alert_count}",
-            delta="In Window",
-            delta_color="off" if alert_count == 0 else "inverse"
+            label="Bars Processed",
+            value=f"{len(ohlcv):,}",
+            delta=(
+                "Y-trade Events" if timeframe == TICK_MODE
+                else f"{timeframe} Bars" if timeframe in info_kinds
+                else f"{timeframe} Interval"
+            )
         )
-    else:
-        st.metric("Alerts Triggered", "0", delta="Waiting for Data")
 
-# ----------------------------------------------------
-# VISUAL ALERT SYSTEM
-# ----------------------------------------------------
-# Alert Section
-st.markdown("---")
-st.subheader("🚨 Alert Status")
-
-latest_z_score = zscore.iloc[-1] if zscore is not None and not zscore.empty else None
-
-if latest_z_score is not None and not np.isnan(latest_z_score):
-    if abs(latest_z_score) > z_alert:
-        logger.warning(f"ALERT: Z-score={latest_z_score:.3f} > threshold={z_alert}")
-        st.error(f"⚠️ **ALERT TRIGGERED!** Z-Score ({latest_z_score:.2f}) exceeded threshold ({z_alert})")
-        st.markdown(f"""
-        <div style='padding: 10px; background-color: #ffcccc; border-left: 5px solid #ff0000; border-radius: 5px; color: black;'>
-        <strong>Action Recommended:</strong> Z-score breach detected. Consider reviewing spread mean-reversion opportunity.
-        </div>
-        """, unsafe_allow_html=True)
+    with k3:
+        if zscore is not None:
+            # Count all historical alerts in the current window
+            alert_count = (zscore.abs() > z_alert).sum()
+            st.metric(
+                label="Alerts Triggered",
+                value=f"{alert_count}",
+                delta="In Window",
+                delta_color="off" if alert_count == 0 else "inverse"
+            )
+        else:
+            st.metric("Alerts Triggered", "0", delta="Waiting for Data")
+
+    # ----------------------------------------------------
+    # VISUAL ALERT SYSTEM
+    # ----------------------------------------------------
+    # Alert Section
+    st.markdown("---")
+    st.subheader("🚨 Alert Status")
+
+    latest_z_score = zscore.iloc[-1] if zscore is not None and not zscore.empty else None
+
+    if latest_z_score is not None and not np.isnan(latest_z_score):
+        if abs(latest_z_score) > z_alert:
+            logger.warning(f"ALERT: Z-score={latest_z_score:.3f} > threshold={z_alert}")
+            st.error(f"⚠️ **ALERT TRIGGERED!** Z-Score ({latest_z_score:.2f}) exceeded threshold ({z_alert})")
+            st.markdown(f"""
+            <div style='padding: 10px; background-color: #ffcccc; border-left: 5px solid #ff0000; border-radius: 5px; color: black;'>
+            <strong>Action Recommended:</strong> Z-score breach detected. Consider reviewing spread mean-reversion opportunity.
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.success(f"✅ Z-Score ({latest_z_score:.2f}) within threshold (±{z_alert})")
     else:
-        st.success(f"✅ Z-Score ({latest_z_score:.2f}) within threshold (±{z_alert})")
-else:
-    st.info("⏳ Collecting data... Alerts will activate once sufficient data is available.")
+        st.info("⏳ Collecting data... Alerts will activate once sufficient data is available.")
 
-# ----------------------------------------------------
-# CHARTS
-# ----------------------------------------------------
-st.subheader("📈 Price Comparison")
+    # ----------------------------------------------------
+    # CHARTS
+    # ----------------------------------------------------
+    zoom_start = zoom_start_of(px)
 
-fig_price = go.Figure()
-fig_price.add_trace(go.Scatter(x=px.index, y=px["close"], name=sym_x))
-fig_price.add_trace(go.Scatter(x=py.index, y=py["close"], name=sym_y, yaxis="y2"))
+    st.subheader("📈 Price Comparison")
 
-fig_price.update_layout(
-    yaxis2=dict(overlaying="y", side="right"),
-    legend=dict(x=0, y=1.1, orientation="h")
-)
-st.plotly_chart(fig_price)
+    price_x, price_y = chart_series(px["close"], zoom_start), chart_series(py["close"], zoom_start)
+    fig_price = go.Figure()
+    fig_price.add_trace(go.Scatter(x=price_x.index, y=price_x, name=sym_x))
+    fig_price.add_trace(go.Scatter(x=price_y.index, y=price_y, name=sym_y, yaxis="y2"))
 
-st.subheader("📉 Spread & Z-Score")
+    fig_price.update_layout(
+        yaxis2=dict(overlaying="y", side="right"),
+        legend=dict(x=0, y=1.1, orientation="h")
+    )
+    st.plotly_chart(fig_price)
 
-if spread is not None and zscore is not None:
-    fig_spread = go.Figure()
-    fig_spread.add_trace(go.Scatter(x=spread.index, y=spread, name="Spread"))
-    fig_spread.add_trace(go.Scatter(x=zscore.index, y=zscore, name="Z-Score", yaxis="y2"))
+    st.subheader("📉 Spread & Z-Score")
 
-    fig_spread.update_layout(
-        yaxis2=dict(overlaying="y", side="right")
-    )
-    st.plotly_chart(fig_spread)
-else:
-    st.info("Insufficient data to calculate Spread and Z-Score.")
+    if spread is not None and zscore is not None:
+        spread_view, zscore_view = chart_series(spread, zoom_start), chart_series(zscore, zoom_start)
+        fig_spread = go.Figure()
+        fig_spread.add_trace(go.Scatter(x=spread_view.index, y=spread_view, name="Spread"))
+        fig_spread.add_trace(go.Scatter(x=zscore_view.index, y=zscore_view, name="Z-Score", yaxis="y2"))
 
-# ----------------------------------------------------
-# ADVANCED ANALYTICS (Requested UI Updates)
-# ----------------------------------------------------
-st.markdown("---")
-st.subheader("🧪 Advanced Quantitative Diagnostics")
+        fig_spread.update_layout(
+            yaxis2=dict(overlaying="y", side="right")
+        )
+        st.plotly_chart(fig_spread)
+    else:
+        st.info("Insufficient data to calculate Spread and Z-Score.")
+
+    if beta_series is not None:
+        st.subheader("⚖ Dynamic Hedge Ratio")
+        fig_beta = go.Figure()
+        beta_view = chart_series(beta_series, zoom_start)
+        fig_beta.add_trace(go.Scatter(x=beta_view.index, y=beta_view, name="β"))
+        st.plotly_chart(fig_beta)
+
+    st.subheader("🔗 Rolling Correlation")
+    if corr is not None:
+        fig_corr = go.Figure()
+        corr_view = chart_series(corr, zoom_start)
+        fig_corr.add_trace(go.Scatter(x=corr_view.index, y=corr_view, name="Correlation"))
+        st.plotly_chart(fig_corr)
+    else:
+        st.info("Insufficient data to calculate Correlation.")
+
+@st.fragment(run_every=diagnostics_every if live else None)
+def diagnostics():
+    view = load_pair_view()
+    if not view["ready"]:
+        return
+    watermark, ohlcv, px, py = (view[k] for k in ("watermark", "ohlcv", "px", "py"))
+    beta, beta_series, analytics_key = view["beta"], view["beta_series"], view["analytics_key"]
+    spread, zscore, rolling_std = view["spread"], view["zscore"], view["rolling_std"]
+    zoom_start = zoom_start_of(px)
+
+    # ----------------------------------------------------
+    # ADVANCED ANALYTICS (Requested UI Updates)
+    # ----------------------------------------------------
+    st.markdown("---")
+    st.subheader("🧪 Advanced Quantitative Diagnostics")
 
-# Layout: 2 Columns for Signal Efficacy and Distribution
-ac1, ac2 = st.columns(2)
+    # Layout: 2 Columns for Signal Efficacy and Distribution
+    ac1, ac2 = st.columns(2)
 
-# 1. Signal Efficacy (Z vs Future Delta)
-with ac1:
-    st.markdown("##### Signal Efficacy (Z vs Future Δ)")
-    st.caption("Negative slope = strong mean reversion = good signal")
-    
-    if spread is not None and zscore is not None:
-        eff_df = calculate_signal_efficacy(spread, zscore, lookahead=5)
-        
-        if eff_df is not None and not eff_df.empty:
-            # Fit trendline
-            z = eff_df["zscore"]
-            y = eff_df["spread_change"]
-            
-            # Simple linear regression for slope
-            slope, intercept = np.polyfit(z, y, 1)
-            trend_line = slope * z + intercept
-            
-            fig_eff = go.Figure()
-            
-            # Scatter points
-            fig_eff.add_trace(go.Scatter(
-                x=z, y=y,
-                mode='markers',
-                name='Signal Efficacy',
-                marker=dict(
-                    color=z, # Color by z-score
-                    colorscale='RdBu', # Red (pos) to Blue (neg)
-                    showscale=False,
-                    opacity=0.6
+    # 1. Signal Efficacy (Z vs Future Delta)
+    with ac1:
+        st.markdown("##### Signal Efficacy (Z vs Future Δ)")
+        st.caption("Negative slope = strong mean reversion = good signal")
+
+        if spread is not None and zscore is not None:
+            eff_df = cache.get_or_compute(
+                ("efficacy", 5) + analytics_key,
+                lambda: calculate_signal_efficacy(spread, zscore, lookahead=5),
+            )
+
+            if eff_df is not None and not eff_df.empty:
+                # Fit trendline on every point, plot a bounded sample of them
+                slope, intercept = np.polyfit(eff_df["zscore"], eff_df["spread_change"], 1)
+                if zoom_start is not None:
+                    eff_df = eff_df[eff_df.index >= zoom_start]
+                eff_view = sample_rows(eff_df, points_for_width(chart_width // 2))
+                z = eff_view["zscore"]
+                y = eff_view["spread_change"]
+                z_ends = np.array([z.min(), z.max()])
+                trend_line = slope * z_ends + intercept
+
+                fig_eff = go.Figure()
+
+                # Scatter points
+                fig_eff.add_trace(go.Scatter(
+                    x=z, y=y,
+                    mode='markers',
+                    name='Signal Efficacy',
+                    marker=dict(
+                        color=z, # Color by z-score
+                        colorscale='RdBu', # Red (pos) to Blue (neg)
+                        showscale=False,
+                        opacity=0.6
+                    )
+                ))
+
+                # Trend line
+                fig_eff.add_trace(go.Scatter(
+                    x=z_ends, y=trend_line,
+                    mode='lines',
+                    name=f'Trend (slope={slope:.4f})',
+                    line=dict(color='orange', width=2, dash='dash')
+                ))
+
+                fig_eff.add_vline(x=0, line_width=1, line_dash="dot", line_color="gray")
+                fig_eff.add_hline(y=0, line_width=1, line_dash="dot", line_color="gray")
+
+                fig_eff.update_layout(
+                    xaxis_title="Z-Score at t",
+                    yaxis_title="Spread Change (t+5)",
+                    legend=dict(x=0.6, y=1.0),
+                    margin=dict(l=20, r=20, t=30, b=20),
+                    height=400
                 )
+                st.plotly_chart(fig_eff, use_container_width=True)
+            else:
+                st.info("Insufficient data for signal efficacy analysis")
+
+    # 2. Z-Score Distribution
+    with ac2:
+        st.markdown("##### Z-Score Distribution")
+        st.caption("Validates threshold selection • Shows tail behavior")
+
+        if zscore is not None:
+            # Binned here, so only 30 bars go to the browser
+            z_binned = zscore if zoom_start is None else zscore[zscore.index >= zoom_start]
+            bin_centers, bin_counts, bin_widths = histogram(z_binned, bins=30)
+            fig_dist = go.Figure()
+            fig_dist.add_trace(go.Bar(
+                x=bin_centers,
+                y=bin_counts,
+                width=bin_widths,
+                marker_color='#2E86C1', # Nice blue
+                opacity=0.85,
+                name='Frequency'
             ))
-            
-            # Trend line
-            fig_eff.add_trace(go.Scatter(
-                x=z, y=trend_line,
-                mode='lines',
-                name=f'Trend (slope={slope:.4f})',
-                line=dict(color='orange', width=2, dash='dash')
-            ))
-            
-            fig_eff.add_vline(x=0, line_width=1, line_dash="dot", line_color="gray")
-            fig_eff.add_hline(y=0, line_width=1, line_dash="dot", line_color="gray")
-            
-            fig_eff.update_layout(
-                xaxis_title="Z-Score at t",
-                yaxis_title="Spread Change (t+5)",
-                legend=dict(x=0.6, y=1.0),
+
+            # Threshold lines (Red/Green dashed)
+            fig_dist.add_vline(x=z_alert, line_width=2, line_dash="dash", line_color="#E74C3C")
+            fig_dist.add_vline(x=-z_alert, line_width=2, line_dash="dash", line_color="#2ECC71")
+            fig_dist.add_vline(x=0, line_width=1, line_dash="dot", line_color="gray")
+
+            fig_dist.update_layout(
+                xaxis_title="Z-Score",
+                yaxis_title="Frequency",
+                showlegend=False,
                 margin=dict(l=20, r=20, t=30, b=20),
                 height=400
             )
-            st.plotly_chart(fig_eff, use_container_width=True)
-        else:
-            st.info("Insufficient data for signal efficacy analysis")
-
-# 2. Z-Score Distribution
-with ac2:
-    st.markdown("##### Z-Score Distribution")
-    st.caption("Validates threshold selection • Shows tail behavior")
-    
-    if zscore is not None:
-        fig_dist = go.Figure()
-        fig_dist.add_trace(go.Histogram(
-            x=zscore,
-            nbinsx=30,
-            marker_color='#2E86C1', # Nice blue
-            opacity=0.85,
-            name='Frequency'
+            st.plotly_chart(fig_dist, use_container_width=True)
+
+    # 3. Rolling Volatility
+    st.markdown("##### Rolling Volatility of Spread")
+    st.caption("Regime detection • Low vol + high |Z| = ideal")
+
+    if rolling_std is not None:
+        vol_mean = rolling_std.mean()
+        vol_high = rolling_std.quantile(0.90) # 90th percentile as "High Vol"
+
+        fig_vol = go.Figure()
+
+        # Fill area
+        vol_view = chart_series(rolling_std, zoom_start)
+        fig_vol.add_trace(go.Scatter(
+            x=vol_view.index, y=vol_view,
+            fill='tozeroy',
+            mode='lines',
+            name='Volatility (σ)',
+            line=dict(color='#8E44AD', width=2) # Purple
         ))
-        
-        # Threshold lines (Red/Green dashed)
-        fig_dist.add_vline(x=z_alert, line_width=2, line_dash="dash", line_color="#E74C3C")
-        fig_dist.add_vline(x=-z_alert, line_width=2, line_dash="dash", line_color="#2ECC71")
-        fig_dist.add_vline(x=0, line_width=1, line_dash="dot", line_color="gray")
-        
-        fig_dist.update_layout(
-            xaxis_title="Z-Score",
-            yaxis_title="Frequency",
-            showlegend=False,
+
+        # Thresholds
+        fig_vol.add_hline(y=vol_high, line_dash="dash", line_color="#E74C3C", annotation_text="High Vol Zone", annotation_position="top right")
+        fig_vol.add_hline(y=vol_mean, line_dash="dash", line_color="gray", annotation_text=f"Mean: {vol_mean:.4f}", annotation_position="top right")
+
+        fig_vol.update_layout(
+            xaxis_title="Time",
+            yaxis_title="Volatility (σ)",
             margin=dict(l=20, r=20, t=30, b=20),
-            height=400
+            height=350,
+            showlegend=False
         )
-        st.plotly_chart(fig_dist, use_container_width=True)
+        st.plotly_chart(fig_vol, use_container_width=True)
 
-# 3. Rolling Volatility
-st.markdown("##### Rolling Volatility of Spread")
-st.caption("Regime detection • Low vol + high |Z| = ideal")
 
-if rolling_std is not None:
-    vol_mean = rolling_std.mean()
-    vol_high = rolling_std.quantile(0.90) # 90th percentile as "High Vol"
-    
-    fig_vol = go.Figure()
-    
-    # Fill area
-    fig_vol.add_trace(go.Scatter(
-        x=rolling_std.index, y=rolling_std,
-        fill='tozeroy',
-        mode='lines',
-        name='Volatility (σ)',
-        line=dict(color='#8E44AD', width=2) # Purple
-    ))
-    
-    # Thresholds
-    fig_vol.add_hline(y=vol_high, line_dash="dash", line_color="#E74C3C", annotation_text="High Vol Zone", annotation_position="top right")
-    fig_vol.add_hline(y=vol_mean, line_dash="dash", line_color="gray", annotation_text=f"Mean: {vol_mean:.4f}", annotation_position="top right")
-    
-    fig_vol.update_layout(
-        xaxis_title="Time",
-        yaxis_title="Volatility (σ)",
-        margin=dict(l=20, r=20, t=30, b=20),
-        height=350,
-        showlegend=False
+    # ----------------------------------------------------
+    # BACKTEST
+    # ----------------------------------------------------
+    with st.expander("💹 Backtest Z-Score Strategy", expanded=False):
+        st.caption(
+            f"Short the spread above +{z_alert}, long below -{z_alert} (the alert threshold), "
+            "exit when |Z| falls back inside the exit band. Costs are charged on the gross notional of both legs."
+        )
+        bt1, bt2, bt3 = st.columns(3)
+        exit_z = bt1.slider("Exit |Z|", 0.0, float(z_alert), 0.0, 0.1)
+        fee_bps = bt2.number_input("Fee (bps per leg)", 0.0, 100.0, 1.0, 0.5)
+        slippage_bps = bt3.number_input("Slippage (bps)", 0.0, 100.0, 1.0, 0.5)
+
+        def run_backtest():
+            # Notional of y plus the hedge leg per unit of spread
+            gross = py["close"].reindex(spread.index) + (np.abs(beta_series if beta_series is not None else beta)
+                                                         * px["close"].reindex(spread.index))
+            return backtest(spread, zscore, z_alert, exit_z, fee_bps, slippage_bps, gross=gross)
+
+        if spread is not None and zscore is not None:
+            bt_frame, bt_summary = cache.get_or_compute(
+                ("backtest", z_alert, exit_z, fee_bps, slippage_bps) + analytics_key, run_backtest
+            )
+            m1, m2, m3, m4, m5 = st.columns(5)
+            m1.metric("Net PnL", f"{bt_summary['net_pnl']:,.2f}", f"costs {bt_summary['costs']:,.2f}", delta_color="off")
+            m2.metric("Trades", bt_summary["trades"], f"turnover {bt_summary['turnover']:,.0f}", delta_color="off")
+            m3.metric("Win Rate", f"{bt_summary['win_rate']:.0%}" if bt_summary["trades"] else "—")
+            m4.metric("Max Drawdown", f"{bt_summary['max_drawdown']:,.2f}")
+            m5.metric(
+                "Avg Holding",
+                str(bt_summary["avg_holding_time"].round("s")).replace("0 days ", "") if "avg_holding_time" in bt_summary
+                else f"{bt_summary['avg_holding_bars']:.1f} bars",
+            )
+
+            fig_bt = go.Figure()
+            equity_view = chart_series(bt_frame["equity"], zoom_start)
+            drawdown_view = chart_series(bt_frame["drawdown"], zoom_start)
+            fig_bt.add_trace(go.Scatter(x=equity_view.index, y=equity_view, name="Equity (net)"))
+            fig_bt.add_trace(go.Scatter(
+                x=drawdown_view.index, y=drawdown_view, name="Drawdown",
+                fill="tozeroy", line=dict(color="#E74C3C", width=1),
+            ))
+            fig_bt.update_layout(
+                yaxis_title="PnL (spread units)",
+                margin=dict(l=20, r=20, t=30, b=20),
+                height=350,
+            )
+            st.plotly_chart(fig_bt, use_container_width=True)
+
+    # ----------------------------------------------------
+    # UNIVERSE PAIR SCREENER
+    # ----------------------------------------------------
+    st.markdown("---")
+    st.subheader("🌐 Universe Pair Screener")
+    st.caption("All symbol pairs on the current timeframe (1m for event bars), screened in one batched pass")
+
+    def screen_universe():
+        universe_bars = load_bars(
+            rule_map.get(timeframe, "1min"),
+            symbols=symbols,
+            start=pd.Timestamp.now(tz="UTC") - pd.Timedelta(lookback),
+        )
+        _, universe, closes = align_closes(universe_bars, symbols)
+        return universe, closes, pair_matrix(closes, universe, window)
+
+    universe, closes, screen = cache.get_or_compute(
+        ("screen", rule_map.get(timeframe, "1min"), lookback, window, watermark), screen_universe
     )
-    st.plotly_chart(fig_vol, use_container_width=True)
-    
-st.subheader("🔗 Rolling Correlation")
-if corr is not None:
-    fig_corr = go.Figure()
-    fig_corr.add_trace(go.Scatter(x=corr.index, y=corr, name="Correlation"))
-    st.plotly_chart(fig_corr)
-else:
-    st.info("Insufficient data to calculate Correlation.")
 
-# ----------------------------------------------------
-# EXPORT
-# ----------------------------------------------------
-st.subheader("⬇ Data Export")
+    if not screen.empty:
+        sc1, sc2 = st.columns([2, 3])
+        with sc1:
+            corr_matrix = correlation_matrix(closes, universe)
+            fig_heat = go.Figure(go.Heatmap(
+                z=corr_matrix.values,
+                x=corr_matrix.columns,
+                y=corr_matrix.index,
+                colorscale="RdBu",
+                zmin=-1, zmax=1,
+            ))
+            fig_heat.update_layout(margin=dict(l=20, r=20, t=30, b=20), height=350)
+            st.plotly_chart(fig_heat, use_container_width=True)
+        with sc2:
+            st.dataframe(
+                screen.style.format({
+                    "beta": "{:.4f}", "corr": "{:.3f}", "zscore": "{:.2f}",
+                    "adf_stat": "{:.2f}", "adf_pvalue": "{:.4f}",
+                }),
+                hide_index=True,
+                use_container_width=True,
+            )
+    else:
+        st.info(f"Insufficient data to screen pairs (need {window} aligned bars).")
 
-st.download_button(
-    "Download OHLCV Data",
-    ohlcv.to_csv(index=False),
-    "ohlcv_data.csv"
-)
+    # ----------------------------------------------------
+    # EXPORT
+    # ----------------------------------------------------
+    st.subheader("⬇ Data Export")
 
-# ----------------------------------------------------
-# AUTO-REFRESH LOGIC (USER CONTROLLED)
-# ----------------------------------------------------
-# Only refresh if the user explicitly enables it to assume control over "flickering"
-if enable_refresh and is_ingestion_running():
-    time.sleep(refresh_rate)
-    st.rerun()
+    st.download_button(
+        "Download OHLCV Data",
+        ohlcv.to_csv(index=False),
+        "ohlcv_data.csv"
+    )
+
+# The sweep is a long, on-demand action: it gets its own fragment without
+# run_every, so the timed refreshes never rerun it mid-sweep
+@st.fragment
+def parameter_sweep():
+    view = load_pair_view()
+    if not view["ready"]:
+        return
+    watermark, px, py = view["watermark"], view["px"], view["py"]
+
+    # ----------------------------------------------------
+    # PARAMETER SWEEP
+    # ----------------------------------------------------
+    st.markdown("---")
+    st.subheader("🧭 Parameter Sweep")
+    st.caption(
+        "Signal efficacy over a grid of rolling window × lookahead × z-threshold for this pair, "
+        "run across a process pool for large grids. Results are cached per data update."
+    )
+
+    if st.button("Run Sweep"):
+        sweep_data = px[["close"]].rename(columns={"close": "x"}).join(
+            py[["close"]].rename(columns={"close": "y"}), how="inner"
+        ).dropna()
+        sweep_key = ("sweep", sym_x, sym_y, timeframe, lookback, watermark)
+        with st.spinner("Sweeping parameter grid..."):
+            sweep_result = cache.get_or_compute(
+                sweep_key,
+                lambda: sweep(
+                    sweep_data["x"].to_numpy(), sweep_data["y"].to_numpy(),
+                    DEFAULT_WINDOWS, DEFAULT_LOOKAHEADS, DEFAULT_THRESHOLDS, pool=sweep_pool(),
+                ),
+            )
+        st.session_state.sweep_result = (sweep_key, sweep_result)
+
+    if "sweep_result" in st.session_state:
+        (_, swept_x, swept_y, swept_tf, _, _), sweep_result = st.session_state.sweep_result
+        if sweep_result.empty:
+            st.info("Not enough aligned bars for the sweep grid.")
+        else:
+            st.caption(f"Last sweep: {swept_x.upper()}/{swept_y.upper()} on {swept_tf}")
+            sw1, sw2 = st.columns(2)
+            with sw1:
+                st.markdown("##### Efficacy Slope (window × lookahead)")
+                slope_grid = sweep_result.pivot_table(index="window", columns="lookahead", values="slope")
+                fig_surface = go.Figure(go.Surface(
+                    z=slope_grid.values, x=slope_grid.columns, y=slope_grid.index, colorscale="RdBu",
+                ))
+                fig_surface.update_layout(
+                    scene=dict(xaxis_title="Lookahead", yaxis_title="Window", zaxis_title="Slope"),
+                    margin=dict(l=0, r=0, t=30, b=0),
+                    height=400,
+                )
+                st.plotly_chart(fig_surface, use_container_width=True)
+            with sw2:
+                sweep_z = st.select_slider("Z-Threshold", options=list(DEFAULT_THRESHOLDS), value=2.0)
+                st.markdown("##### Hit Rate (window × lookahead)")
+                hit_grid = sweep_result[sweep_result.z_threshold == sweep_z].pivot_table(
+                    index="window", columns="lookahead", values="hit_rate"
+                )
+                fig_hits = go.Figure(go.Heatmap(
+                    z=hit_grid.values, x=hit_grid.columns, y=hit_grid.index, colorscale="Viridis", zmin=0, zmax=1,
+                ))
+                fig_hits.update_layout(
+                    xaxis_title="Lookahead", yaxis_title="Window",
+                    margin=dict(l=20, r=20, t=30, b=20), height=340,
+                )
+                st.plotly_chart(fig_hits, use_container_width=True)
+            best = sweep_result.dropna(subset=["slope"]).sort_values("slope").head(5)
+            st.dataframe(best, hide_index=True, use_container_width=True)
+
+live_panels()
+diagnostics()
+parameter_sweep()
@@ -0,0 +1,74 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from analytics import adf_test
+
+logger = logging.getLogger(__name__)
+
+def align_closes(bars, symbols=None):
+    """
+    Pivot a bars frame (symbol, timestamp, close, ...) into one 2-D array of
+    closes, shape (bars, symbols). Gaps are forward filled; leading rows
+    where any symbol has no bar yet are dropped.
+    Returns (index, symbols, closes).
+    """
+    wide = bars.pivot_table(index="timestamp", columns="symbol", values="close", aggfunc="last")
+    if symbols is not None:
+        wide = wide.reindex(columns=[s for s in symbols if s in wide.columns])
+    wide = wide.sort_index().ffill().dropna()
+    return wide.index, list(wide.columns), wide.to_numpy(dtype=float)
+
+def pair_matrix(closes, symbols, window):
+    """
+    Screens all N·(N-1)/2 pairs of an aligned close array in batch.
+
+    Static OLS betas and correlations come from one covariance matrix; the
+    spreads y - alpha - beta·x of every pair are built as one (bars, pairs)
+    array, from which the latest rolling z-score (over `window` bars) and a
+    lag-0 ADF test are computed column-wise.
+
+    Returns a DataFrame with one row per pair (x, y, beta, corr, zscore,
+    adf_stat, adf_pvalue), most stationary spread first.
+    """
+    n_bars, n_sym = closes.shape
+    columns = ["x", "y", "beta", "corr", "zscore", "adf_stat", "adf_pvalue"]
+    if n_sym < 2 or n_bars < max(window, 3):
+        logger.warning(f"Insufficient data for pair screening: {n_bars} bars, {n_sym} symbols")
+        return pd.DataFrame(columns=columns)
+
+    means = closes.mean(axis=0)
+    centered = closes - means
+    cov = centered.T @ centered / (n_bars - 1)
+    var = np.diag(cov)
+
+    ix, iy = np.triu_indices(n_sym, k=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = cov[ix, iy] / var[ix]
+        corr = cov[ix, iy] / np.sqrt(var[ix] * var[iy])
+
+    # (bars, pairs) residual spreads; demeaned, so alpha drops out
+    spreads = centered[:, iy] - beta * centered[:, ix]
+
+    tail = spreads[-window:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = tail.std(axis=0, ddof=1)
+        zscore = np.where(std > 0, (tail[-1] - tail.mean(axis=0)) / std, np.nan)
+
+    adf_stat, adf_p = adf_test(spreads, lags=0)
+
+    result = pd.DataFrame({
+        "x": np.asarray(symbols)[ix],
+        "y": np.asarray(symbols)[iy],
+        "beta": beta,
+        "corr": corr,
+        "zscore": zscore,
+        "adf_stat": adf_stat,
+        "adf_pvalue": adf_p,
+    })
+    return result.sort_values(["adf_pvalue", "adf_stat"], na_position="last").reset_index(drop=True)
+
+def correlation_matrix(closes, symbols):
+    """Full N x N correlation of the aligned closes as a labelled DataFrame."""
+    return pd.DataFrame(np.corrcoef(closes, rowvar=False), index=symbols, columns=symbols)
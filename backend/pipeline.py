@@ -0,0 +1,144 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 50_000
+BATCH_SIZE = 1_000
+
+# What submit() does when the queue is full:
+#   drop_newest - discard the incoming message
+#   drop_oldest - discard the oldest queued message to make room (freshest data wins)
+#   block       - wait up to block_timeout for room, then drop the incoming message
+DROP_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+class IngestPipeline:
+    """
+    Bounded producer/consumer stage between the websocket callback and the DB.
+    The callback only enqueues the raw message (submit); a dedicated writer
+    thread decodes in batches and hands rows to a TickWriter. A slow disk
+    therefore shows up as queue depth / drops instead of a stalled socket.
+    """
+
+    def __init__(self, writer, decode, maxsize=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 policy="drop_oldest", block_timeout=0.05):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {policy!r}, expected one of {DROP_POLICIES}")
+        self.writer = writer
+        self.decode = decode
+        self.batch_size = batch_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.processed = 0
+        self.decode_errors = 0
+        self.write_errors = 0
+        self.max_depth = 0
+
+    def submit(self, msg):
+        """Producer side, safe to call from the websocket thread. Never touches the DB."""
+        try:
+            if self.policy == "block":
+                self._queue.put(msg, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(msg)
+        except queue.Full:
+            if self.policy != "drop_oldest":
+                self.dropped += 1
+                return False
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            try:
+                self._queue.put_nowait(msg)
+            except queue.Full:
+                self.dropped += 1
+                return False
+
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="IngestWriter")
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stop after draining what is already queued. By default waits for the
+        drain to finish; returns False if `timeout` ran out first, in which
+        case the writer thread may still be using the writer.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Pipeline drain did not finish within {timeout}s: {self.stats()}")
+                return False
+        logger.info(f"Pipeline stopped: {self.stats()}")
+        return True
+
+    def stats(self):
+        return {
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "decode_errors": self.decode_errors,
+            "write_errors": self.write_errors,
+        }
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._stop.is_set():
+                    break
+                continue
+
+            rows = []
+            for msg in batch:
+                try:
+                    row = self.decode(msg)
+                except Exception as e:
+                    self.decode_errors += 1
+                    logger.error(f"Error decoding message: {e}")
+                    continue
+                if row is not None:
+                    rows.append(row)
+
+            if rows:
+                # A failing write (DB error, writer hook) must not end the
+                # thread, or the queue would only ever drop from then on
+                try:
+                    self.writer.write_many(rows)
+                except Exception as e:
+                    self.write_errors += 1
+                    logger.error(f"Error writing {len(rows)} rows: {e}", exc_info=True)
+            self.processed += len(batch)
@@ -0,0 +1,147 @@
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def synthetic_trades(symbols, seed=0):
+    """Endless stream of raw trade payloads shaped like Binance `trade` events."""
+    rnd = random.Random(seed)
+    prices = {s: 100.0 * (i + 1) for i, s in enumerate(symbols)}
+    for trade_id in itertools.count(1):
+        s = symbols[trade_id % len(symbols)]
+        prices[s] *= 1 + rnd.gauss(0, 1e-4)
+        yield {
+            "e": "trade", "E": 0, "s": s.upper(), "t": trade_id,
+            "p": f"{prices[s]:.2f}", "q": f"{rnd.expovariate(10):.5f}",
+            "T": 0, "m": rnd.random() < 0.5, "M": True,
+        }
+
+def recorded_trades(path):
+    """Loop over raw trade payloads stored one JSON object per line."""
+    with open(path) as f:
+        msgs = [json.loads(line) for line in f if line.strip()]
+    if not msgs:
+        raise ValueError(f"No messages in {path}")
+    return itertools.cycle(msgs)
+
+class ReplayWebsocketManager:
+    """
+    Local stand-in for binance.ThreadedWebsocketManager.
+    Once start() is called, a feeder thread pushes messages from `source` into
+    the subscribed callbacks at `rate` msgs/s for `duration` seconds (or
+    `limit` messages). Event/trade times are restamped with the send time,
+    so a stored tick's ts is also its ingest timestamp, and trade ids are
+    renumbered so looped recordings are not dropped as duplicates.
+    """
+
+    def __init__(self, rate=1_000, duration=10.0, source=None, limit=None):
+        self.rate = rate
+        self.duration = duration
+        self.source = source
+        self.limit = limit
+        self.sent = 0
+        self.done = threading.Event()
+        self._callbacks = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._feed, daemon=True, name="ReplayFeeder")
+
+    def start_trade_socket(self, callback, symbol):
+        self._callbacks[symbol.upper()] = callback
+        # The real manager starts streaming as soon as a socket is opened
+        if self._thread.ident is None:
+            self._thread.start()
+        return f"{symbol.lower()}@trade"
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+
+    def join(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def _feed(self):
+        # Give every subscription a chance to register before streaming
+        time.sleep(0.05)
+        source = self.source or synthetic_trades(list(self._callbacks))
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                elapsed = time.perf_counter() - start
+                if elapsed >= self.duration or (self.limit and self.sent >= self.limit):
+                    break
+                # Send whatever is owed at this point in time, then yield
+                due = int(elapsed * self.rate) - self.sent
+                if due <= 0:
+                    time.sleep(0.0005)
+                    continue
+                now_ms = int(time.time() * 1000)
+                for msg in itertools.islice(source, due):
+                    callback = self._callbacks.get(msg["s"])
+                    if callback is None:
+                        continue
+                    msg = dict(msg, E=now_ms, T=now_ms, t=self.sent + 1)
+                    callback(msg)
+                    self.sent += 1
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self.done.set()
+
+class MockBinanceClient:
+    """
+    Local stand-in for the binance.client.Client trade endpoints
+    (get_recent_trades, get_historical_trades). Each symbol has an in-memory
+    tape with sequential trade ids; advance() appends new trades to simulate
+    activity between polls.
+    """
+
+    def __init__(self, symbols, trades_per_symbol=1_000, seed=0, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.tapes = {s.upper(): [] for s in symbols}
+        self.advance(trades_per_symbol)
+
+    def advance(self, n):
+        """Append n new trades to every symbol's tape."""
+        now_ms = int(time.time() * 1000)
+        with self._lock:
+            for i, tape in enumerate(self.tapes.values()):
+                price = float(tape[-1]["price"]) if tape else 100.0 * (i + 1)
+                next_id = tape[-1]["id"] + 1 if tape else 1
+                for k in range(n):
+                    price *= 1 + self._rnd.gauss(0, 1e-4)
+                    tape.append({
+                        "id": next_id + k, "price": f"{price:.2f}",
+                        "qty": f"{self._rnd.expovariate(10):.5f}", "quoteQty": "0",
+                        "time": now_ms - (n - k), "isBuyerMaker": self._rnd.random() < 0.5,
+                        "isBestMatch": True,
+                    })
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_recent_trades(self, symbol, limit=500):
+        self._call()
+        with self._lock:
+            return list(self.tapes[symbol][-limit:])
+
+    def get_historical_trades(self, symbol, fromId=None, limit=500):
+        self._call()
+        with self._lock:
+            tape = self.tapes[symbol]
+            if fromId is None:
+                return list(tape[-limit:])
+            start = max(int(fromId) - tape[0]["id"], 0)
+            return list(tape[start:start + limit])
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+
+from storage import BAR_RULES, BAR_OPEN_SQL, BAR_CLOSE_SQL, get_connection, configure_connection
+
+logger = logging.getLogger(__name__)
+
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+# Pruning works in slices aligned to the coarsest bar, so a rolled-up bar is
+# never built from half a bucket
+ALIGN_MS = max(BAR_RULES.values())
+CHUNK_MS = 10 * 60_000
+VACUUM_PAGES = 2000
+MAINTENANCE_INTERVAL = 300
+
+class RetentionPolicy:
+    """
+    How long each tier is kept. None means forever.
+    Defaults: raw ticks 24h, 1s bars 7 days, 1min/5min bars indefinitely,
+    archived tick days 90 days.
+
+    With archive=True every closed UTC day is compacted out of SQLite into
+    the tick archive before raw ticks are pruned, so SQLite never holds
+    ticks from before today's midnight and tick_hours only bites when it is
+    shorter than the time since midnight. The archive is then expired by
+    archive_days instead.
+    """
+
+    def __init__(self, tick_hours=24, bar_days=None, archive=True, archive_days=90):
+        self.tick_hours = tick_hours
+        self.bar_days = {"1s": 7, "1min": None, "5min": None}
+        if bar_days:
+            self.bar_days.update(bar_days)
+        self.archive = archive
+        self.archive_days = archive_days
+
+def _rollup_ticks(conn, sid, lo, hi):
+    # Fill bars that are missing for the slice about to be deleted.
+    # INSERT OR IGNORE never touches bars already built at ingest time.
+    for rule, ms in BAR_RULES.items():
+        conn.execute(f"""
+            INSERT OR IGNORE INTO bars_{rule} (symbol_id, ts, open, high, low, close, volume, closed,
+                                               first_ts, last_ts)
+            SELECT g.symbol_id, g.bucket, {BAR_OPEN_SQL}, g.high, g.low, {BAR_CLOSE_SQL}, g.volume, 1,
+                   g.first_ts, g.last_ts
+            FROM (
+                SELECT symbol_id, ts - ts % {ms} AS bucket,
+                       MIN(ts) AS first_ts, MAX(ts) AS last_ts,
+                       MAX(price) AS high, MIN(price) AS low, SUM(qty) AS volume
+                FROM ticks WHERE symbol_id = ? AND ts >= ? AND ts < ?
+                GROUP BY bucket
+            ) g
+        """, (sid, lo, hi))
+
+def _rollup_bars(conn, src, sid, lo, hi):
+    # Coarser tables only; a source bar never feeds a finer one
+    for rule, ms in BAR_RULES.items():
+        if ms <= BAR_RULES[src]:
+            continue
+        conn.execute(f"""
+            INSERT OR IGNORE INTO bars_{rule} (symbol_id, ts, open, high, low, close, volume, closed,
+                                               first_ts, last_ts)
+            SELECT g.symbol_id, g.bucket, o.open, g.high, g.low, c.close, g.volume, 1,
+                   o.first_ts, c.last_ts
+            FROM (
+                SELECT symbol_id, ts - ts % {ms} AS bucket,
+                       MIN(ts) AS first_ts, MAX(ts) AS last_ts,
+                       MAX(high) AS high, MIN(low) AS low, SUM(volume) AS volume
+                FROM bars_{src} WHERE symbol_id = ? AND ts >= ? AND ts < ?
+                GROUP BY bucket
+            ) g
+            JOIN bars_{src} o ON o.symbol_id = g.symbol_id AND o.ts = g.first_ts
+            JOIN bars_{src} c ON c.symbol_id = g.symbol_id AND c.ts = g.last_ts
+        """, (sid, lo, hi))
+
+def _prune(conn, table, cutoff, rollup, stop_event=None, pause=0.05):
+    """
+    Delete rows older than cutoff one symbol / time slice per transaction,
+    rolling each slice up first. Short transactions keep the writer unblocked.
+    """
+    deleted = 0
+    sids = [r[0] for r in conn.execute("SELECT id FROM symbols")]
+    for sid in sids:
+        oldest = conn.execute(f"SELECT MIN(ts) FROM {table} WHERE symbol_id = ?", (sid,)).fetchone()[0]
+        if oldest is None:
+            continue
+        lo = oldest - oldest % ALIGN_MS
+        while lo < cutoff:
+            if stop_event is not None and stop_event.is_set():
+                return deleted
+            hi = min(lo + CHUNK_MS, cutoff)
+            with conn:
+                rollup(conn, sid, lo, hi)
+                cur = conn.execute(
+                    f"DELETE FROM {table} WHERE symbol_id = ? AND ts >= ? AND ts < ?", (sid, lo, hi)
+                )
+            deleted += cur.rowcount
+            lo = hi
+            time.sleep(pause)
+    return deleted
+
+def run_maintenance(policy=None, stop_event=None):
+    """One maintenance pass: archive, roll up, prune, expire the archive, incremental vacuum."""
+    policy = policy or RetentionPolicy()
+    stats = {"archived": 0, "ticks": 0}
+    start = time.perf_counter()
+    now_ms = int(time.time() * 1000)
+
+    if policy.archive:
+        from archive import compact_closed_days, prune_archive
+        stats["archived"] = compact_closed_days()
+        if policy.archive_days is not None:
+            stats["archive_days_pruned"] = prune_archive(now_ms - policy.archive_days * DAY_MS)
+
+    conn = configure_connection(get_connection())
+
+    if policy.tick_hours is not None:
+        cutoff = now_ms - policy.tick_hours * HOUR_MS
+        cutoff -= cutoff % ALIGN_MS
+        stats["ticks"] = _prune(conn, "ticks", cutoff, _rollup_ticks, stop_event)
+
+    for rule, days in policy.bar_days.items():
+        if days is None:
+            continue
+        cutoff = now_ms - days * DAY_MS
+        cutoff -= cutoff % ALIGN_MS
+        rollup = lambda c, sid, lo, hi, src=rule: _rollup_bars(c, src, sid, lo, hi)
+        stats[f"bars_{rule}"] = _prune(conn, f"bars_{rule}", cutoff, rollup, stop_event)
+
+    # No-op unless the file was created with auto_vacuum=INCREMENTAL (see init_db)
+    # executescript runs the pragma to completion; execute() frees a single page
+    conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES});")
+    conn.close()
+
+    logger.info(f"Maintenance pass done in {time.perf_counter() - start:.1f}s: {stats}")
+    return stats
+
+def start_maintenance(stop_event, policy=None, interval=MAINTENANCE_INTERVAL):
+    """Run run_maintenance every `interval` seconds in a daemon thread until stop_event is set."""
+    def loop():
+        while not stop_event.is_set():
+            try:
+                run_maintenance(policy, stop_event)
+            except Exception as e:
+                logger.error(f"Maintenance pass failed: {e}")
+            stop_event.wait(interval)
+
+    thread = threading.Thread(target=loop, daemon=True, name="MaintenanceThread")
+    thread.start()
+    return thread
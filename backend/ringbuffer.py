@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RING_NAME = "quant_ticks"
+RING_CAPACITY = 1 << 20
+MAX_SYMBOLS = 256
+SYMBOL_BYTES = 32
+
+_MAGIC = 0x5449434B52494E47  # "TICKRING"
+# Header slots (int64)
+_H_MAGIC, _H_CAPACITY, _H_COUNT, _H_LAST_ID, _H_TOKEN, _H_CLOSED, _H_PID = range(7)
+_HEADER = 8
+
+def _layout(capacity):
+    """Byte offsets of the header, symbol table and column arrays."""
+    offsets = {"header": 0, "symbols": _HEADER * 8}
+    pos = offsets["symbols"] + MAX_SYMBOLS * SYMBOL_BYTES
+    for name, dtype in (("id", "int64"), ("floor", "int64"), ("ts", "int64"), ("price", "float64"),
+                        ("qty", "float64"), ("sym", "int32")):
+        offsets[name] = pos
+        pos += capacity * np.dtype(dtype).itemsize
+    return offsets, pos
+
+class TickRing:
+    """
+    Fixed-size tick ring in shared memory with a single writer (the ingest
+    daemon) and any number of readers (dashboard sessions).
+
+    Slots hold committed ticks with their SQLite rowid, so a reader can
+    resume from its own watermark. The writer fills the slots first and then
+    bumps the count, so a reader never sees a half-written row; a reader that
+    falls more than `capacity` rows behind is told so and re-reads SQLite.
+    Use create() in the writer and attach() in readers.
+
+    Rowids are not dense (ignored duplicates consume ids), so each row also
+    carries the floor of its commit: the highest table id before that
+    commit. The ring holds every row after a watermark only if each commit's
+    floor is at or below the row before it; rows committed by another
+    process (e.g. backfill) break that chain and send the reader to SQLite.
+    """
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self.owner = owner
+        # Writer threads in this process take turns; count/slots are not atomic
+        self._publish_lock = threading.Lock()
+        self.header = np.ndarray(_HEADER, dtype="int64", buffer=shm.buf)
+        self.capacity = int(self.header[_H_CAPACITY])
+        offsets, _ = _layout(self.capacity)
+        self._names = np.ndarray(MAX_SYMBOLS, dtype=f"S{SYMBOL_BYTES}", buffer=shm.buf,
+                                 offset=offsets["symbols"])
+        self.id = np.ndarray(self.capacity, dtype="int64", buffer=shm.buf, offset=offsets["id"])
+        self.floor = np.ndarray(self.capacity, dtype="int64", buffer=shm.buf, offset=offsets["floor"])
+        self.ts = np.ndarray(self.capacity, dtype="int64", buffer=shm.buf, offset=offsets["ts"])
+        self.price = np.ndarray(self.capacity, dtype="float64", buffer=shm.buf, offset=offsets["price"])
+        self.qty = np.ndarray(self.capacity, dtype="float64", buffer=shm.buf, offset=offsets["qty"])
+        self.sym = np.ndarray(self.capacity, dtype="int32", buffer=shm.buf, offset=offsets["sym"])
+
+    @classmethod
+    def create(cls, name=RING_NAME, capacity=RING_CAPACITY):
+        _, size = _layout(capacity)
+        try:
+            # Left behind by a writer that died without unlinking
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray(_HEADER, dtype="int64", buffer=shm.buf)
+        header[:] = 0
+        header[_H_CAPACITY] = capacity
+        header[_H_TOKEN] = time.time_ns()
+        header[_H_PID] = os.getpid()
+        header[_H_MAGIC] = _MAGIC
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name=RING_NAME):
+        """Reader view of the ring, or None when no daemon has created it."""
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return None
+        try:
+            # Readers must not unlink the segment when they exit (Python < 3.13)
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        if np.ndarray(1, dtype="int64", buffer=shm.buf)[0] != _MAGIC:
+            shm.close()
+            return None
+        return cls(shm, owner=False)
+
+    @property
+    def token(self):
+        """Identifies this ring instance; changes when the daemon restarts."""
+        return int(self.header[_H_TOKEN])
+
+    @property
+    def closed(self):
+        return bool(self.header[_H_CLOSED])
+
+    @property
+    def count(self):
+        return int(self.header[_H_COUNT])
+
+    @property
+    def last_id(self):
+        return int(self.header[_H_LAST_ID])
+
+    def publish(self, rows, symbol_ids, after_id):
+        """
+        Writer side: append committed (id, ts, symbol_id, price, qty) rows.
+        symbol_ids maps names to the symbol ids used in the rows; after_id is
+        the highest table id before the commit (TickWriter's on_insert hook).
+        """
+        n = len(rows)
+        if not n:
+            return
+        for name, sid in symbol_ids.items():
+            if sid < MAX_SYMBOLS and not self._names[sid]:
+                self._names[sid] = name.encode()[:SYMBOL_BYTES]
+        if n > self.capacity:
+            # The dropped head was committed too: the kept rows follow it
+            after_id = int(rows[-self.capacity - 1][0])
+            rows = rows[-self.capacity:]
+        cols = np.array(rows, dtype="float64").T
+        with self._publish_lock:
+            count = self.count
+            pos = (count + np.arange(len(rows))) % self.capacity
+            self.id[pos] = cols[0]
+            self.floor[pos] = after_id
+            self.ts[pos] = cols[1]
+            self.sym[pos] = cols[2]
+            self.price[pos] = cols[3]
+            self.qty[pos] = cols[4]
+            self.header[_H_LAST_ID] = int(rows[-1][0])
+            # Publish last: readers only look at slots below the count
+            self.header[_H_COUNT] = count + len(rows)
+
+    def names(self):
+        """Symbol id -> name for every symbol published so far."""
+        return {i: n.decode() for i, n in enumerate(self._names) if n}
+
+    def since(self, after_id):
+        """
+        Rows with id > after_id as (id, ts, sym, price, qty) arrays plus the
+        count they were read at, or None if the ring does not hold all of
+        them (lapped, or rows committed by another writer in between). Views
+        into shared memory unless the range wraps around; they stay valid
+        until the writer laps them, see lapped().
+        """
+        count = self.count
+        oldest = max(count - self.capacity, 0)
+        if count == 0 or after_id >= self.last_id:
+            empty = np.empty(0, dtype="int64")
+            return (empty, empty, np.empty(0, dtype="int32"), np.empty(0), np.empty(0)), count
+        if after_id < self.floor[oldest % self.capacity]:
+            return None
+
+        # Ids increase along the ring, so the start is one search per segment
+        start, end = oldest % self.capacity, count % self.capacity or self.capacity
+        if start < end:
+            segments = [slice(start, end)]
+        else:
+            segments = [slice(start, self.capacity), slice(0, end)]
+        cols = []
+        for sl in segments:
+            skip = int(np.searchsorted(self.id[sl], after_id, side="right"))
+            sl = slice(sl.start + skip, sl.stop)
+            cols.append((self.id[sl], self.floor[sl], self.ts[sl], self.sym[sl], self.price[sl], self.qty[sl]))
+        if len(cols) == 1 or not len(cols[0][0]):
+            out = cols[-1]
+        else:
+            out = tuple(np.concatenate(parts) for parts in zip(*cols))
+        ids, floor = out[0], out[1]
+        # Every commit must start at or below the row read before it
+        if len(ids) and (floor[0] > after_id or np.any(floor[1:] > ids[:-1])):
+            return None
+        return (ids,) + out[2:], count
+
+    def lapped(self, count_read, rows):
+        """True if the writer has overwritten any of `rows` read at `count_read`."""
+        return self.count - self.capacity > count_read - rows
+
+    def stats(self):
+        return {"count": self.count, "last_id": self.last_id, "capacity": self.capacity,
+                "token": self.token, "closed": self.closed}
+
+    def close(self):
+        """Detach; the writer also marks the ring closed and removes it."""
+        if self.owner:
+            self.header[_H_CLOSED] = 1
+        del self.header, self._names, self.id, self.floor, self.ts, self.price, self.qty, self.sym
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
@@ -1,40 +1,560 @@
 import sqlite3
-import pandas as pd
+import numbers
+import threading
+import logging
+import time
+from datetime import datetime, timedelta, timezone
 
 import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_NAME = os.path.join(BASE_DIR, "market_data.db")
 
-def get_connection():
-    return sqlite3.connect(DB_NAME, check_same_thread=False)
+logger = logging.getLogger(__name__)
 
-def init_db():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
+# Write path tuning.
+# FLUSH_INTERVAL is the latency vs throughput knob: ticks sit in memory for at
+# most this many seconds before they are committed. Larger values mean bigger
+# batches per commit (more ticks/sec) but the dashboard sees them later.
+FLUSH_INTERVAL = 0.5
+FLUSH_SIZE = 500
+# A failed flush (e.g. the DB stayed locked past busy_timeout) puts its rows
+# back and is retried with a doubling backoff. Only past MAX_PENDING queued
+# rows, or when close() still cannot write after CLOSE_RETRIES, are rows dropped.
+MAX_PENDING = 200_000
+RETRY_BACKOFF = 0.5
+MAX_RETRY_BACKOFF = 10.0
+CLOSE_RETRIES = 3
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def get_connection(db_path=None):
+    return sqlite3.connect(db_path or DB_NAME, check_same_thread=False)
+
+def configure_connection(conn):
+    """Pragmas for a long-lived writer connection (WAL, relaxed fsync)."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable across app crashes in WAL mode, only an OS crash /
+    # power loss can drop the last commits - acceptable for market data.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    # Writer and maintenance connections wait on each other instead of failing
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+SCHEMA_VERSION = 5
+
+# Materialized OHLCV bars, keyed by the dashboard's resample rules.
+# Bucket starts are epoch aligned, which matches pandas resample for these rules.
+BAR_RULES = {"1s": 1_000, "1min": 60_000, "5min": 300_000}
+
+def to_epoch_ms(value):
+    """Convert an epoch-ms number, ISO string or datetime to epoch milliseconds (UTC)."""
+    if isinstance(value, numbers.Real):
+        return int(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return (value - _EPOCH) // timedelta(milliseconds=1)
+    # pandas is imported only where it is needed (string parsing and the read
+    # paths), so the ingest process (writer only) starts without it
+    import pandas as pd
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.value // 1_000_000)
+
+def _table_columns(conn, table):
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+def _create_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS symbols (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+    # ts is epoch milliseconds (UTC). id gives a monotonic insertion order.
+    # trade_id is the exchange trade id when known (NULL for migrated rows).
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS ticks (
-            timestamp TEXT,
-            symbol TEXT,
-            price REAL,
-            qty REAL
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts INTEGER NOT NULL,
+            symbol_id INTEGER NOT NULL REFERENCES symbols(id),
+            price REAL NOT NULL,
+            qty REAL NOT NULL,
+            trade_id INTEGER
         )
     """)
+    if "trade_id" not in _table_columns(conn, "ticks"):
+        conn.execute("ALTER TABLE ticks ADD COLUMN trade_id INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ticks_symbol_ts ON ticks(symbol_id, ts)")
+    # Makes re-inserting an already stored trade (backfill overlap) a no-op
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_ticks_symbol_trade ON ticks(symbol_id, trade_id)")
+    for rule in BAR_RULES:
+        # closed = 1 once a tick in a later bucket has been seen for the symbol.
+        # first_ts / last_ts are the ts of the ticks open and close came from.
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS bars_{rule} (
+                symbol_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL NOT NULL,
+                high REAL NOT NULL,
+                low REAL NOT NULL,
+                close REAL NOT NULL,
+                volume REAL NOT NULL,
+                closed INTEGER NOT NULL DEFAULT 0,
+                first_ts INTEGER,
+                last_ts INTEGER,
+                PRIMARY KEY (symbol_id, ts)
+            ) WITHOUT ROWID
+        """)
+        if "first_ts" not in _table_columns(conn, f"bars_{rule}"):
+            # Pre-v5 bars keep their open; any later tick still replaces close
+            conn.execute(f"ALTER TABLE bars_{rule} ADD COLUMN first_ts INTEGER")
+            conn.execute(f"ALTER TABLE bars_{rule} ADD COLUMN last_ts INTEGER")
+            conn.execute(f"UPDATE bars_{rule} SET first_ts = ts, last_ts = ts")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_bars_{rule}_open ON bars_{rule}(symbol_id) WHERE closed = 0")
+
+def migrate_v1_to_v2(conn):
+    """
+    Move a v1 `ticks (timestamp TEXT, symbol TEXT, price, qty)` table to the v2 layout.
+    Timestamps are converted in SQL; rows that cannot be parsed are skipped.
+    """
+    logger.info("Migrating ticks table to schema v2...")
+    with conn:
+        conn.execute("ALTER TABLE ticks RENAME TO ticks_v1")
+        _create_schema(conn)
+        conn.execute("""
+            INSERT OR IGNORE INTO symbols (name)
+            SELECT DISTINCT lower(symbol) FROM ticks_v1 WHERE symbol IS NOT NULL
+        """)
+        # julianday() keeps ~0.05ms precision, enough to round to whole ms
+        conn.execute("""
+            INSERT INTO ticks (ts, symbol_id, price, qty)
+            SELECT CAST(ROUND((julianday(t.timestamp) - 2440587.5) * 86400000.0) AS INTEGER),
+                   s.id, t.price, t.qty
+            FROM ticks_v1 t
+            JOIN symbols s ON s.name = lower(t.symbol)
+            WHERE julianday(t.timestamp) IS NOT NULL
+            ORDER BY t.rowid
+        """)
+        migrated = conn.execute("SELECT COUNT(*) FROM ticks").fetchone()[0]
+        conn.execute("DROP TABLE ticks_v1")
+    logger.info(f"Migration complete: {migrated} ticks")
+
+def init_db(db_path=None):
+    conn = get_connection(db_path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0 and not _table_columns(conn, "ticks"):
+        # Fresh file: lets retention hand freed pages back with incremental_vacuum.
+        # Must happen before the first table and before switching to WAL.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    configure_connection(conn)
+    if version < SCHEMA_VERSION:
+        if "timestamp" in _table_columns(conn, "ticks"):
+            migrate_v1_to_v2(conn)
+        _create_schema(conn)
+        if version < 3:
+            rebuild_bars(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
+def get_symbol_id(conn, name):
+    """Id of `name` in the symbols dictionary, inserting it on first use."""
+    conn.execute("INSERT OR IGNORE INTO symbols (name) VALUES (?)", (name,))
+    return conn.execute("SELECT id FROM symbols WHERE name = ?", (name,)).fetchone()[0]
+
+def update_bars(conn, rows):
+    """
+    Fold (ts, symbol_id, price, qty) rows into every bars_<rule> table.
+    Each batch is pre-aggregated per bucket and merged with an upsert, so a bar
+    can be built across many flushes. Open and close follow tick time rather
+    than arrival: a tick only replaces open if it is earlier than the bar's
+    first tick and close if it is not earlier than its last, so late ticks
+    (backfilled gaps) land in the right place. Bars older than a symbol's newest
+    bucket are marked closed. Does not commit; runs inside the caller's transaction.
+    """
+    for rule, ms in BAR_RULES.items():
+        agg = {}
+        latest = {}
+        for ts, sid, price, qty in rows:
+            key = (sid, ts - ts % ms)
+            bar = agg.get(key)
+            if bar is None:
+                # open, high, low, close, volume, first_ts, last_ts
+                agg[key] = [price, price, price, price, qty, ts, ts]
+            else:
+                if price > bar[1]:
+                    bar[1] = price
+                if price < bar[2]:
+                    bar[2] = price
+                if ts < bar[5]:
+                    bar[0], bar[5] = price, ts
+                if ts >= bar[6]:
+                    bar[3], bar[6] = price, ts
+                bar[4] += qty
+            if key[1] > latest.get(sid, -1):
+                latest[sid] = key[1]
+
+        # Every SET expression sees the row as it was before the update
+        conn.executemany(f"""
+            INSERT INTO bars_{rule} (symbol_id, ts, open, high, low, close, volume, first_ts, last_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (symbol_id, ts) DO UPDATE SET
+                open = CASE WHEN excluded.first_ts < first_ts THEN excluded.open ELSE open END,
+                first_ts = MIN(first_ts, excluded.first_ts),
+                high = MAX(high, excluded.high),
+                low = MIN(low, excluded.low),
+                close = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close ELSE close END,
+                last_ts = MAX(last_ts, excluded.last_ts),
+                volume = volume + excluded.volume
+        """, [(sid, bucket, *bar) for (sid, bucket), bar in agg.items()])
+        conn.executemany(
+            f"UPDATE bars_{rule} SET closed = 1 WHERE closed = 0 AND symbol_id = ? AND ts < ?",
+            list(latest.items())
+        )
+
+# Open/close for a group g of ticks (symbol_id, first_ts, last_ts): the earliest
+# and latest tick by ts, ties broken by insertion order as in update_bars
+BAR_OPEN_SQL = """(SELECT price FROM ticks WHERE symbol_id = g.symbol_id AND ts = g.first_ts
+                   ORDER BY id LIMIT 1)"""
+BAR_CLOSE_SQL = """(SELECT price FROM ticks WHERE symbol_id = g.symbol_id AND ts = g.last_ts
+                    ORDER BY id DESC LIMIT 1)"""
+
+def rebuild_bars(conn, rules=None):
+    """Recompute bar tables from the raw ticks (used when the tables are first created)."""
+    for rule in rules or BAR_RULES:
+        ms = BAR_RULES[rule]
+        conn.execute(f"DELETE FROM bars_{rule}")
+        conn.execute(f"""
+            INSERT INTO bars_{rule} (symbol_id, ts, open, high, low, close, volume, closed, first_ts, last_ts)
+            SELECT g.symbol_id, g.bucket, {BAR_OPEN_SQL}, g.high, g.low, {BAR_CLOSE_SQL}, g.volume,
+                   g.bucket < MAX(g.bucket) OVER (PARTITION BY g.symbol_id), g.first_ts, g.last_ts
+            FROM (
+                SELECT symbol_id, ts - ts % {ms} AS bucket,
+                       MIN(ts) AS first_ts, MAX(ts) AS last_ts,
+                       MAX(price) AS high, MIN(price) AS low, SUM(qty) AS volume
+                FROM ticks GROUP BY symbol_id, bucket
+            ) g
+        """)
+
 def insert_tick(row):
+    """Single row insert. Prefer TickWriter on any hot path."""
     conn = get_connection()
     cur = conn.cursor()
+    tick = (to_epoch_ms(row["timestamp"]), get_symbol_id(conn, row["symbol"]), row["price"], row["qty"])
     cur.execute(
-        "INSERT INTO ticks VALUES (?, ?, ?, ?)",
-        (row["timestamp"], row["symbol"], row["price"], row["qty"])
+        "INSERT OR IGNORE INTO ticks (ts, symbol_id, price, qty, trade_id) VALUES (?, ?, ?, ?, ?)",
+        tick + (row.get("trade_id"),)
     )
+    if cur.rowcount:
+        update_bars(conn, [tick])
     conn.commit()
     conn.close()
 
-def load_ticks():
+def last_trade_ids(symbols):
+    """Highest stored exchange trade id per symbol name (None if unknown)."""
+    conn = get_connection()
+    result = {}
+    for name in symbols:
+        row = conn.execute("""
+            SELECT MAX(t.trade_id) FROM ticks t JOIN symbols s ON s.id = t.symbol_id
+            WHERE s.name = ?
+        """, (name,)).fetchone()
+        result[name] = row[0]
+    conn.close()
+    return result
+
+def get_watermark(db_path=None):
+    """
+    Data version of the tick store: the highest tick rowid ever assigned.
+    AUTOINCREMENT keeps it monotonic even after rows are compacted away,
+    so anything derived from the ticks can be cached against it.
+    """
+    conn = get_connection(db_path)
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'ticks'").fetchone()
+    conn.close()
+    return row[0] if row else 0
+
+class TickWriter:
+    """
+    Buffered tick writer holding one long-lived SQLite connection.
+    Rows are kept in memory and written with executemany when either
+    flush_size rows are pending or flush_interval seconds have passed.
+    Call close() on shutdown so the last partial batch is not lost.
+
+    A batch that fails to commit goes back to the front of the buffer and is
+    retried after a backoff; the oldest rows are dropped only once more than
+    max_pending rows are waiting.
+    """
+
+    def __init__(self, db_path=None, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 materialize_bars=True, on_flush=None, on_insert=None, max_pending=MAX_PENDING):
+        self.db_path = db_path or DB_NAME
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.materialize_bars = materialize_bars
+        # Optional hook called as on_flush(rows) right after each commit
+        self.on_flush = on_flush
+        # Optional hook called as on_insert(rows, symbol_ids, after_id) with the
+        # rows the commit actually added, as (id, ts, symbol_id, price, qty).
+        # after_id is the highest id in the table before the commit: the rows
+        # are exactly the table's rows with id > after_id. Ids are not dense
+        # (ignored duplicates still consume AUTOINCREMENT ids). Called while
+        # the flush still holds the connection, so calls follow commit order.
+        self.on_insert = on_insert
+
+        self._conn = configure_connection(
+            sqlite3.connect(self.db_path, check_same_thread=False)
+        )
+        self._buffer = []
+        self._symbol_ids = {}
+        self._buffer_lock = threading.Lock()
+        # Serializes use of the connection between callers and the timer thread
+        self._db_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+        # Counters, updated under _buffer_lock
+        self.rows_written = 0
+        self.duplicates = 0
+        self.flushes = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self._timer = threading.Thread(
+            target=self._flush_loop, daemon=True, name="TickWriterFlush"
+        )
+        self._timer.start()
+
+    def write(self, row):
+        """Queue one tick (same dict shape as insert_tick)."""
+        ts = row["timestamp"]
+        if not isinstance(ts, numbers.Integral):
+            ts = to_epoch_ms(ts)
+        self.write_many([(ts, row["symbol"], row["price"], row["qty"], row.get("trade_id"))])
+
+    def write_many(self, rows):
+        """
+        Queue (epoch_ms, symbol, price, qty[, trade_id]) tuples.
+        Rows whose (symbol, trade_id) is already stored are skipped on flush.
+        """
+        with self._buffer_lock:
+            self._buffer.extend(rows)
+            full = len(self._buffer) >= self.flush_size
+        if full:
+            self.flush()
+
+    def flush(self, force=False):
+        """
+        Write everything buffered so far in a single transaction. While a
+        failed flush is backing off this is a no-op unless `force` is set.
+        """
+        with self._buffer_lock:
+            if not self._buffer or (not force and time.monotonic() < self._retry_at):
+                return 0
+            batch, self._buffer = self._buffer, []
+
+        with self._db_lock:
+            conn = self._conn
+            try:
+                # Take the write lock up front so the rowid range read below
+                # contains exactly the rows inserted by this flush
+                conn.execute("BEGIN IMMEDIATE")
+                # Symbols first seen here only join the cache once the commit
+                # succeeds; after a rollback their ids do not exist
+                ids = dict(self._symbol_ids)
+                for row in batch:
+                    if row[1] not in ids:
+                        ids[row[1]] = get_symbol_id(conn, row[1])
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM ticks").fetchone()[0]
+                conn.executemany(
+                    "INSERT OR IGNORE INTO ticks (ts, symbol_id, price, qty, trade_id) VALUES (?, ?, ?, ?, ?)",
+                    [(r[0], ids[r[1]], r[2], r[3], r[4] if len(r) > 4 else None) for r in batch]
+                )
+                # Only rows that were actually new feed the bars (no double counting)
+                inserted = conn.execute(
+                    "SELECT id, ts, symbol_id, price, qty FROM ticks WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+                if self.materialize_bars:
+                    update_bars(conn, [r[1:] for r in inserted])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                self._requeue(batch, e)
+                return 0
+            self._symbol_ids = ids
+            # Still under the db lock, so commits are published in commit order
+            if self.on_insert is not None:
+                self.on_insert(inserted, dict(ids), last_id)
+
+        with self._buffer_lock:
+            self.rows_written += len(inserted)
+            self.duplicates += len(batch) - len(inserted)
+            self.flushes += 1
+            self._backoff = self._retry_at = 0.0
+        if self.on_flush is not None:
+            self.on_flush(batch)
+        return len(inserted)
+
+    def _requeue(self, batch, error):
+        # Failed rows go back in front of anything queued since, so the
+        # retry keeps their order; past max_pending the oldest are dropped
+        with self._buffer_lock:
+            self._buffer[:0] = batch
+            self.failed += 1
+            self._backoff = min(max(self._backoff * 2, RETRY_BACKOFF), MAX_RETRY_BACKOFF)
+            self._retry_at = time.monotonic() + self._backoff
+            overflow = len(self._buffer) - self.max_pending
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self.dropped += overflow
+            pending = len(self._buffer)
+        logger.error(
+            f"Tick flush of {len(batch)} rows failed, retrying in {self._backoff:.1f}s "
+            f"({pending} pending, {max(overflow, 0)} dropped): {error}"
+        )
+
+    def _flush_loop(self):
+        # Time based threshold: keeps latency bounded when the feed is quiet
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Stop the timer, flush the remaining rows and close the connection."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._timer.join(timeout=self.flush_interval + 1)
+        for attempt in range(CLOSE_RETRIES + 1):
+            if attempt:
+                time.sleep(self._backoff)
+            self.flush(force=True)
+            with self._buffer_lock:
+                if not self._buffer:
+                    break
+        with self._buffer_lock:
+            lost, self._buffer = len(self._buffer), []
+            self.dropped += lost
+        if lost:
+            logger.error(f"TickWriter closing with the DB unwritable, dropped {lost} rows")
+        with self._db_lock:
+            self._conn.close()
+        logger.info(f"TickWriter closed ({self.rows_written} rows in {self.flushes} flushes, "
+                    f"{self.failed} failed, {self.dropped} dropped)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_ticks(symbols=None, start=None, end=None, after_id=None):
+    """Raw frame (id, ts, symbol, price, qty) with the filters applied in SQL."""
+    sql = """
+        SELECT t.id, t.ts, s.name AS symbol, t.price, t.qty
+        FROM ticks t JOIN symbols s ON s.id = t.symbol_id
+    """
+    # For tail reads the unary + keeps SQLite on the rowid range instead of
+    # walking the whole (symbol_id, ts) index for each symbol.
+    col = "+t." if after_id else "t."
+    clauses, params = [], []
+    if after_id:
+        clauses.append("t.id > ?")
+        params.append(int(after_id))
+    if symbols is not None:
+        symbols = list(symbols)
+        placeholders = ", ".join("?" for _ in symbols)
+        clauses.append(f"{col}symbol_id IN (SELECT id FROM symbols WHERE name IN ({placeholders}))")
+        params.extend(symbols)
+    if start is not None:
+        clauses.append(f"{col}ts >= ?")
+        params.append(to_epoch_ms(start))
+    if end is not None:
+        clauses.append(f"{col}ts < ?")
+        params.append(to_epoch_ms(end))
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if after_id is not None:
+        sql += " ORDER BY t.id"
+
+    import pandas as pd  # lazy, see to_epoch_ms
+    conn = get_connection()
+    df = pd.read_sql(sql, conn, params=params)
+    conn.close()
+    df["id"] = df["id"].astype("int64")
+    df["ts"] = df["ts"].astype("int64")
+    return df
+
+def _typed(df):
+    import pandas as pd  # lazy, see to_epoch_ms
+    df = df.drop(columns="id").rename(columns={"ts": "timestamp"})
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
+    return df
+
+def load_ticks(symbols=None, start=None, end=None):
+    """
+    Load ticks as a typed frame: timestamp (datetime64, UTC), symbol, price, qty.
+    symbols filters by name; start (inclusive) and end (exclusive) accept epoch ms
+    or anything pd.Timestamp understands (naive values are taken as UTC).
+    All filters are applied in SQL against the (symbol_id, ts) index.
+    """
+    return _typed(_read_ticks(symbols, start, end))
+
+def load_tick_rows_since(watermark=0, symbols=None, start=None):
+    """
+    Untyped tail read: rows with id > watermark as (id, ts, symbol, price, qty),
+    ts in epoch ms, ordered by id. start bounds the very first read.
+    """
+    return _read_ticks(symbols, start, after_id=watermark)
+
+def load_ticks_since(watermark=0, symbols=None, start=None):
+    """
+    Incremental reader. Returns (df, watermark) where df holds only the ticks
+    inserted after `watermark` (same columns as load_ticks) and watermark is
+    the rowid to pass on the next call.
+    """
+    raw = load_tick_rows_since(watermark, symbols, start)
+    if not raw.empty:
+        watermark = int(raw["id"].iloc[-1])
+    return _typed(raw), watermark
+
+def load_bars(rule, symbols=None, start=None, end=None):
+    """
+    Read materialized bars for one of BAR_RULES. Same columns as
+    analytics.resample_ohlcv: symbol, timestamp (UTC), open, high, low, close, volume.
+    The newest bar of each symbol is still open and may change.
+    """
+    if rule not in BAR_RULES:
+        raise ValueError(f"No materialized bars for rule {rule!r}")
+    sql = f"""
+        SELECT s.name AS symbol, b.ts AS timestamp, b.open, b.high, b.low, b.close, b.volume
+        FROM bars_{rule} b JOIN symbols s ON s.id = b.symbol_id
+    """
+    clauses, params = [], []
+    if symbols is not None:
+        symbols = list(symbols)
+        placeholders = ", ".join("?" for _ in symbols)
+        clauses.append(f"b.symbol_id IN (SELECT id FROM symbols WHERE name IN ({placeholders}))")
+        params.extend(symbols)
+    if start is not None:
+        clauses.append("b.ts >= ?")
+        params.append(to_epoch_ms(start))
+    if end is not None:
+        clauses.append("b.ts < ?")
+        params.append(to_epoch_ms(end))
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY s.name, b.ts"
+
+    import pandas as pd  # lazy, see to_epoch_ms
     conn = get_connection()
-    df = pd.read_sql("SELECT * FROM ticks", conn, parse_dates=["timestamp"])
+    df = pd.read_sql(sql, conn, params=params)
     conn.close()
+    df["timestamp"] = pd.to_datetime(df["timestamp"].astype("int64"), unit="ms", utc=True)
     return df
@@ -0,0 +1,624 @@
+import bisect
+import collections
+import copy
+import math
+
+import numpy as np
+import pandas as pd
+
+# Windowed sums are recomputed from the raw window this often, which keeps
+# floating point drift from the add/remove updates bounded (amortized O(1)).
+RESYNC_EVERY = 1_000
+
+class BarStream:
+    """
+    Shared plumbing for the streaming engines: a growable per-bar history
+    table (one row per bar, `columns` wide) and frame driven updates.
+
+    Subclasses implement _step(x, y) for a new bar and _replace_last(x, y)
+    for a new value of the newest bar (the open bar's close keeps moving
+    until it is finalized). Both return the history row for that bar.
+    update() drops history older than the frame it was given (keeping at
+    least `window` bars), so the history is bounded by the lookback.
+    State is plain Python/NumPy data, so an engine can live in
+    st.session_state across reruns; to_state()/from_state() give a
+    serializable checkpoint.
+    """
+
+    columns = ()
+
+    def _init_history(self):
+        self.last_index = None
+        self._index = []
+        self._n = 0
+        self._hist = np.full((1024, len(self.columns)), np.nan)
+
+    def __len__(self):
+        return self._n
+
+    def _store(self, row, values):
+        if row >= len(self._hist):
+            grown = np.full((len(self._hist) * 2, len(self.columns)), np.nan)
+            grown[:len(self._hist)] = self._hist
+            self._hist = grown
+        self._hist[row] = values
+
+    def append(self, index, x, y):
+        """Add one bar; re-appending the previous index replaces that bar."""
+        x, y = float(x), float(y)
+        if self.last_index is not None and index == self.last_index:
+            self._store(self._n - 1, self._replace_last(x, y))
+            return
+        self._store(self._n, self._step(x, y))
+        self._index.append(index)
+        self._n += 1
+        self.last_index = index
+
+    def _bulk(self, index, x, y):
+        """First load of history. Subclasses may vectorize this."""
+        for i, xv, yv in zip(index, x, y):
+            self.append(i, xv, yv)
+
+    def update(self, merged):
+        """
+        Feed a frame with columns x, y indexed by bar time. Only bars at or
+        after last_index are processed, so repeated calls with a growing frame
+        cost O(new bars). Bars before the frame's first index are trimmed.
+        """
+        if not len(merged):
+            return self
+        first = merged.index[0]
+        if self.last_index is None:
+            self._bulk(merged.index, merged["x"].to_numpy(float), merged["y"].to_numpy(float))
+        else:
+            merged = merged[merged.index >= self.last_index]
+            for index, x, y in zip(merged.index, merged["x"].to_numpy(), merged["y"].to_numpy()):
+                self.append(index, x, y)
+        self._trim(first)
+        return self
+
+    def _trim(self, first):
+        # Rows before `first` have scrolled out of the lookback. The window
+        # state lives outside the history, but keep `window` rows so warm-up
+        # checks on len(self) still see a full window. Compacting only once
+        # half the rows are stale keeps this amortized O(1) per bar.
+        drop = min(bisect.bisect_left(self._index, first), self._n - self.window)
+        if drop <= 0 or drop < self._n // 2:
+            return
+        live = self._n - drop
+        self._hist[:live] = self._hist[drop:self._n]
+        self._hist[live:self._n] = np.nan
+        del self._index[:drop]
+        self._n = live
+
+    def history(self, index=None):
+        """History rows (n, len(columns)) and their index, optionally aligned to `index`."""
+        h = self._hist[:self._n]
+        idx = pd.Index(self._index)
+        if index is not None:
+            pos = idx.get_indexer(index)
+            h = np.where((pos >= 0)[:, None], h[np.maximum(pos, 0)], np.nan)
+            idx = index
+        return h, idx
+
+    def to_state(self):
+        state = copy.deepcopy({k: v for k, v in self.__dict__.items() if k != "_hist"})
+        state["_hist"] = self._hist[:self._n].copy()
+        state["engine"] = type(self).__name__
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        engine = cls.__new__(cls)
+        state = dict(state)
+        if state.pop("engine", cls.__name__) != cls.__name__:
+            raise ValueError(f"Checkpoint is not a {cls.__name__}")
+        hist = state.pop("_hist")
+        engine.__dict__.update(copy.deepcopy(state))
+        engine._hist = np.full((max(1024, 2 * len(hist)), len(cls.columns)), np.nan)
+        engine._hist[:len(hist)] = hist
+        return engine
+
+class _WindowSums:
+    """Running mean/std (ddof=1) of one series over the last `window` values."""
+
+    def __init__(self, window, resync_every=RESYNC_EVERY):
+        self.window = window
+        self.resync_every = resync_every
+        self.values = collections.deque()
+        self.ref = 0.0
+        self.s = self.ss = 0.0
+        self.since_resync = 0
+
+    def push(self, v):
+        if not self.values:
+            self.ref = v
+        self.values.append(v)
+        d = v - self.ref
+        self.s += d
+        self.ss += d * d
+        if len(self.values) > self.window:
+            d = self.values.popleft() - self.ref
+            self.s -= d
+            self.ss -= d * d
+        self.since_resync += 1
+        if self.since_resync >= self.resync_every:
+            self.ref = sum(self.values) / len(self.values)
+            self.s = sum(v - self.ref for v in self.values)
+            self.ss = sum((v - self.ref) ** 2 for v in self.values)
+            self.since_resync = 0
+
+    def replace_last(self, v):
+        d = self.values.pop() - self.ref
+        self.s -= d
+        self.ss -= d * d
+        self.values.append(v)
+        d = v - self.ref
+        self.s += d
+        self.ss += d * d
+
+    def moments(self):
+        n = len(self.values)
+        if n < self.window:
+            return math.nan, math.nan
+        mean = self.s / n
+        var = (self.ss - self.s * mean) / (n - 1)
+        return mean + self.ref, math.sqrt(max(var, 0.0))
+
+class RollingPairStats(BarStream):
+    """
+    Streaming rolling moments of a bar pair (x, y) over `window` bars.
+
+    append() costs O(1): it keeps running sums of x, y, x², y² and xy over the
+    window, shifted by a reference value for numerical stability. For every
+    bar it stores the window means, variances (ddof=1) and covariance, which
+    is enough to derive the spread (y - beta·x) mean/std, z-score and x/y
+    correlation for *any* beta without another rolling pass. Output matches
+    the pandas .rolling(window, min_periods=window) path to float tolerance.
+    """
+
+    columns = ("x", "y", "mean_x", "mean_y", "var_x", "var_y", "cov_xy")
+
+    def __init__(self, window, resync_every=RESYNC_EVERY):
+        self.window = window
+        self.resync_every = resync_every
+        self._init_history()
+        self._win = collections.deque()
+        self._kx = self._ky = 0.0
+        self._sx = self._sy = self._sxx = self._syy = self._sxy = 0.0
+        self._since_resync = 0
+
+    def _add(self, x, y):
+        dx, dy = x - self._kx, y - self._ky
+        self._sx += dx
+        self._sy += dy
+        self._sxx += dx * dx
+        self._syy += dy * dy
+        self._sxy += dx * dy
+
+    def _remove(self, x, y):
+        dx, dy = x - self._kx, y - self._ky
+        self._sx -= dx
+        self._sy -= dy
+        self._sxx -= dx * dx
+        self._syy -= dy * dy
+        self._sxy -= dx * dy
+
+    def _resync(self):
+        n = len(self._win)
+        self._kx = sum(p[0] for p in self._win) / n
+        self._ky = sum(p[1] for p in self._win) / n
+        self._sx = self._sy = self._sxx = self._syy = self._sxy = 0.0
+        for x, y in self._win:
+            self._add(x, y)
+        self._since_resync = 0
+
+    def _row(self, x, y):
+        n = len(self._win)
+        if n < self.window:
+            return (x, y) + (np.nan,) * 5
+        mx, my = self._sx / n, self._sy / n
+        vx = (self._sxx - self._sx * mx) / (n - 1)
+        vy = (self._syy - self._sy * my) / (n - 1)
+        cxy = (self._sxy - self._sx * my) / (n - 1)
+        return (x, y, mx + self._kx, my + self._ky, max(vx, 0.0), max(vy, 0.0), cxy)
+
+    def _step(self, x, y):
+        if not self._win:
+            self._kx, self._ky = x, y
+        self._win.append((x, y))
+        self._add(x, y)
+        if len(self._win) > self.window:
+            self._remove(*self._win.popleft())
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            self._resync()
+        return self._row(x, y)
+
+    def _replace_last(self, x, y):
+        self._remove(*self._win.pop())
+        self._win.append((x, y))
+        self._add(x, y)
+        return self._row(x, y)
+
+    def latest(self, beta):
+        """Scalar (spread, zscore, corr, spread_std) for the newest bar."""
+        if self._n == 0:
+            return (np.nan,) * 4
+        return _spread_stats(*self._hist[self._n - 1], beta)
+
+    def results(self, beta, index=None):
+        """
+        Series (spread, zscore, corr, rolling_std) for every stored bar,
+        vectorized over the stored moments. `index` restricts the output to
+        those bars (e.g. the frame being plotted).
+        """
+        h, idx = self.history(index)
+        spread, zscore, corr, std = _spread_stats(*h.T, beta)
+        return (
+            pd.Series(spread, index=idx),
+            pd.Series(zscore, index=idx),
+            pd.Series(corr, index=idx),
+            pd.Series(std, index=idx),
+        )
+
+class RecursiveLeastSquares(BarStream):
+    """
+    Exponentially weighted recursive least squares hedge ratio, y = alpha + beta·x.
+
+    The fit is kept as decayed sufficient statistics (weight, Σx, Σy, Σx²,
+    Σy², Σxy with forgetting factor `lam`), which is the closed form of RLS
+    with forgetting: each bar costs O(1) and beta/alpha/R² follow directly,
+    so regime drift is tracked without refitting history. The default `lam`
+    gives the same effective memory as an EWM with span=window. The residual
+    spread y - alpha - beta·x is z-scored over the last `window` bars.
+
+    The first update() initializes the whole history in one vectorized pass;
+    later bars are folded in one at a time.
+    """
+
+    columns = ("x", "y", "beta", "alpha", "r2", "spread", "spread_mean", "spread_std")
+
+    def __init__(self, window, lam=None, resync_every=RESYNC_EVERY):
+        self.window = window
+        self.lam = 1 - 2 / (window + 1) if lam is None else lam
+        self._init_history()
+        # Decayed sums of (1, dx, dy, dx², dy², dx·dy), shifted by (kx, ky)
+        self._kx = self._ky = None
+        self._sums = (0.0,) * 6
+        self._prev_sums = self._sums
+        self._spread = _WindowSums(window, resync_every)
+
+    def _fit(self, sums, x, y):
+        w, sx, sy, sxx, syy, sxy = sums
+        mx, my = sx / w, sy / w
+        vx, vy, cxy = sxx / w - mx * mx, syy / w - my * my, sxy / w - mx * my
+        if self._n + 1 < self.window or vx <= 0:
+            return math.nan, math.nan, math.nan, math.nan
+        beta = cxy / vx
+        alpha = my + self._ky - beta * (mx + self._kx)
+        r2 = cxy * cxy / (vx * vy) if vy > 0 else math.nan
+        return beta, alpha, r2, y - alpha - beta * x
+
+    def _fold(self, x, y):
+        dx, dy = x - self._kx, y - self._ky
+        lam = self.lam
+        self._sums = tuple(
+            lam * s + v for s, v in zip(self._prev_sums, (1.0, dx, dy, dx * dx, dy * dy, dx * dy))
+        )
+        beta, alpha, r2, spread = self._fit(self._sums, x, y)
+        return beta, alpha, r2, spread
+
+    def _step(self, x, y):
+        if self._kx is None:
+            self._kx, self._ky = x, y
+        self._prev_sums = self._sums
+        beta, alpha, r2, spread = self._fold(x, y)
+        if not math.isnan(spread):
+            self._spread.push(spread)
+        return (x, y, beta, alpha, r2, spread) + self._spread.moments()
+
+    def _replace_last(self, x, y):
+        was_pushed = not math.isnan(self._hist[self._n - 1, 5])
+        self._n -= 1
+        beta, alpha, r2, spread = self._fold(x, y)
+        self._n += 1
+        if was_pushed:
+            self._spread.replace_last(spread)
+        elif not math.isnan(spread):
+            self._spread.push(spread)
+        return (x, y, beta, alpha, r2, spread) + self._spread.moments()
+
+    def _bulk(self, index, x, y):
+        n = len(x)
+        if n == 0:
+            return
+        self._kx, self._ky = float(x[0]), float(y[0])
+        dx, dy = x - self._kx, y - self._ky
+        terms = (np.ones(n), dx, dy, dx * dx, dy * dy, dx * dy)
+        from scipy.signal import lfilter  # heavy import, only needed for the batch start
+        # S_t = lam * S_{t-1} + v_t for every sum at once
+        w, sx, sy, sxx, syy, sxy = lfilter([1.0], [1.0, -self.lam], np.vstack(terms), axis=1)
+        mx, my = sx / w, sy / w
+        vx, vy, cxy = sxx / w - mx * mx, syy / w - my * my, sxy / w - mx * my
+        with np.errstate(invalid="ignore", divide="ignore"):
+            beta = np.where(vx > 0, cxy / vx, np.nan)
+            r2 = np.where(vy > 0, cxy * cxy / (vx * vy), np.nan)
+        beta[:self.window - 1] = np.nan
+        r2[np.isnan(beta)] = np.nan
+        alpha = my + self._ky - beta * (mx + self._kx)
+        spread = y - alpha - beta * x
+
+        # Window stats of the spread over its valid (post warm-up) bars
+        valid = pd.Series(spread[~np.isnan(spread)])
+        rolling = valid.rolling(self.window, min_periods=self.window)
+        spread_mean = np.full(n, np.nan)
+        spread_std = np.full(n, np.nan)
+        spread_mean[~np.isnan(spread)] = rolling.mean().to_numpy()
+        spread_std[~np.isnan(spread)] = rolling.std().to_numpy()
+        for v in valid.to_numpy()[-self.window:]:
+            self._spread.push(float(v))
+
+        self._sums = tuple(float(a[-1]) for a in (w, sx, sy, sxx, syy, sxy))
+        self._prev_sums = (
+            tuple(float(a[-2]) for a in (w, sx, sy, sxx, syy, sxy)) if n > 1 else (0.0,) * 6
+        )
+        self._hist = np.full((max(1024, 2 * n), len(self.columns)), np.nan)
+        self._hist[:n] = np.column_stack([x, y, beta, alpha, r2, spread, spread_mean, spread_std])
+        self._index = list(index)
+        self._n = n
+        self.last_index = self._index[-1]
+
+    def latest(self):
+        """Scalar (beta, alpha, r_squared, spread, zscore, spread_std) for the newest bar."""
+        if self._n == 0:
+            return (np.nan,) * 6
+        _, _, beta, alpha, r2, spread, mean, std = self._hist[self._n - 1]
+        zscore = (spread - mean) / std if std > 0 else np.nan
+        return beta, alpha, r2, spread, zscore, std
+
+    def results(self, index=None):
+        """Series (beta, alpha, r_squared, spread, zscore, rolling_std) for every stored bar."""
+        h, idx = self.history(index)
+        _, _, beta, alpha, r2, spread, mean, std = h.T
+        std = np.where(std > 0, std, np.nan)
+        zscore = (spread - mean) / std
+        return tuple(pd.Series(v, index=idx) for v in (beta, alpha, r2, spread, zscore, std))
+
+class KalmanHedge(BarStream):
+    """
+    Kalman filter hedge ratio and intercept: y_t = alpha_t + beta_t·x_t + e_t,
+    with (beta, alpha) following a random walk.
+
+    The prior comes from an OLS fit of the first `window` bars. The process
+    noise is `delta` times that fit's coefficient covariance (larger adapts
+    faster) and the observation noise is its residual variance. The
+    intercept is kept relative to an EWM of x, so drift in the price level
+    does not show up as drift in alpha. Each bar then costs one 2x2 update
+    in plain floats, so a filter per pair is cheap to run live across many
+    pairs.
+
+    The spread is the one-step prediction error (innovation), and rolling_std
+    is its predicted std sqrt(S_t), so zscore = e_t / sqrt(S_t). R² is
+    1 - var(e)/var(y) over the last `window` bars.
+    """
+
+    columns = ("x", "y", "beta", "alpha", "r2", "spread", "spread_std")
+
+    def __init__(self, window, delta=0.1, resync_every=RESYNC_EVERY):
+        self.window = window
+        self.delta = delta
+        self._follow = 2 / (window + 1)
+        self._init_history()
+        self._warm = []
+        # (kx, beta, a, p00, p01, p11, q00, q01, q11, ve); a is the intercept
+        # at x = kx, which keeps P well conditioned at large price levels
+        self._state = None
+        self._snap = (None, [])
+        self._resid = _WindowSums(window, resync_every)
+        self._level = _WindowSums(window, resync_every)
+
+    def _prior(self, x, y):
+        kx = float(np.mean(x))
+        a = np.column_stack([np.asarray(x, float) - kx, np.ones(len(x))])
+        coef, *_ = np.linalg.lstsq(a, np.asarray(y, float), rcond=None)
+        resid = np.asarray(y, float) - a @ coef
+        ve = max(float(resid @ resid) / max(len(x) - 2, 1), 1e-12)
+        p = ve * np.linalg.pinv(a.T @ a)
+        q = self.delta * p
+        self._state = (kx, float(coef[0]), float(coef[1]),
+                       p[0, 0], p[0, 1], p[1, 1], q[0, 0], q[0, 1], q[1, 1], ve)
+
+    def _advance(self, x, y):
+        """Fold in one bar; returns (beta, alpha, innovation, innovation std)."""
+        if self._state is None:
+            self._warm.append((x, y))
+            if len(self._warm) == self.window:
+                self._prior(*zip(*self._warm))
+                self._warm = []
+            return math.nan, math.nan, math.nan, math.nan
+        kx, b, a, p00, p01, p11, q00, q01, q11, ve = self._state
+        # Move the intercept's reference point along with the price level:
+        # a -> a + b·shift, P -> T P T' with T = [[1, 0], [shift, 1]]
+        shift = self._follow * (x - kx)
+        kx += shift
+        a += b * shift
+        p11 += 2 * shift * p01 + shift * shift * p00
+        p01 += shift * p00
+        p00, p01, p11 = p00 + q00, p01 + q01, p11 + q11
+        dx = x - kx
+        e = y - (b * dx + a)
+        ph0, ph1 = p00 * dx + p01, p01 * dx + p11
+        S = dx * ph0 + ph1 + ve
+        k0, k1 = ph0 / S, ph1 / S
+        b, a = b + k0 * e, a + k1 * e
+        p00, p01, p11 = p00 - k0 * ph0, p01 - k0 * ph1, p11 - k1 * ph1
+        self._state = (kx, b, a, p00, p01, p11, q00, q01, q11, ve)
+        return b, a - b * kx, e, math.sqrt(S)
+
+    def _r2(self):
+        _, resid_std = self._resid.moments()
+        _, level_std = self._level.moments()
+        if not level_std > 0:
+            return math.nan
+        return 1 - (resid_std / level_std) ** 2
+
+    def _step(self, x, y):
+        self._snap = (self._state, list(self._warm) if self._state is None else None)
+        beta, alpha, e, std = self._advance(x, y)
+        if not math.isnan(e):
+            self._resid.push(e)
+            self._level.push(y)
+        return (x, y, beta, alpha, self._r2(), e, std)
+
+    def _replace_last(self, x, y):
+        was_pushed = not math.isnan(self._hist[self._n - 1, 5])
+        self._state, warm = self._snap
+        if warm is not None:
+            self._warm = list(warm)
+        beta, alpha, e, std = self._advance(x, y)
+        if was_pushed:
+            self._resid.replace_last(e)
+            self._level.replace_last(y)
+        elif not math.isnan(e):
+            self._resid.push(e)
+            self._level.push(y)
+        return (x, y, beta, alpha, self._r2(), e, std)
+
+    def _bulk(self, index, x, y):
+        n = len(x)
+        w = min(self.window, n)
+        out = np.full((n, len(self.columns)), np.nan)
+        out[:, 0], out[:, 1] = x, y
+        self._warm = [(float(a), float(b)) for a, b in zip(x[:w], y[:w])]
+        self._snap = (None, self._warm[:-1])
+        if w == self.window:
+            self._prior(x[:w], y[:w])
+            self._warm = []
+        # The filter recursion is inherently sequential; it runs on floats
+        for i in range(w, n):
+            self._snap = (self._state, None)
+            out[i, [2, 3, 5, 6]] = self._advance(float(x[i]), float(y[i]))
+
+        # Window R² over the filtered bars, vectorized, then seed the
+        # running sums with the tail of the window
+        live = ~np.isnan(out[:, 5])
+        resid = pd.Series(out[live, 5]).rolling(self.window, min_periods=self.window).var()
+        level = pd.Series(out[live, 1]).rolling(self.window, min_periods=self.window).var()
+        out[live, 4] = (1 - resid / level.where(level > 0)).to_numpy()
+        for e, yv in zip(out[live, 5][-self.window:], out[live, 1][-self.window:]):
+            self._resid.push(float(e))
+            self._level.push(float(yv))
+
+        self._hist = np.full((max(1024, 2 * n), len(self.columns)), np.nan)
+        self._hist[:n] = out
+        self._index = list(index)
+        self._n = n
+        self.last_index = self._index[-1] if n else None
+
+    def latest(self):
+        """Scalar (beta, alpha, r_squared, spread, zscore, spread_std) for the newest bar."""
+        if self._n == 0:
+            return (np.nan,) * 6
+        _, _, beta, alpha, r2, spread, std = self._hist[self._n - 1]
+        return beta, alpha, r2, spread, spread / std if std > 0 else np.nan, std
+
+    def results(self, index=None):
+        """Series (beta, alpha, r_squared, spread, zscore, rolling_std) for every stored bar."""
+        h, idx = self.history(index)
+        _, _, beta, alpha, r2, spread, std = h.T
+        std = np.where(std > 0, std, np.nan)
+        return tuple(pd.Series(v, index=idx) for v in (beta, alpha, r2, spread, spread / std, std))
+
+class AsofPairStream:
+    """
+    Tick-level pair series without bars: every trade of `sym_y` is one event,
+    paired with the last known trade price of `sym_x` (as-of, no look-ahead).
+
+    refresh(buffer) reads only ticks appended to a tick_buffer.TickBuffer
+    since the previous call and aligns them in one linear pass (running
+    maximum over the positions of x trades), carrying the last x price across
+    calls. Event times never go backwards, and trades in the same
+    millisecond are spaced by 1µs, so the event index is unique and
+    increasing and the bar engines can stream over it unchanged.
+    """
+
+    def __init__(self, sym_x, sym_y, capacity=4096):
+        self.sym_x = sym_x
+        self.sym_y = sym_y
+        self.position = 0
+        self._last_x = np.nan
+        self._last_us = -1  # last event time, epoch µs
+        self._n = 0
+        self._ts = np.empty(capacity, dtype="int64")  # epoch µs
+        self._xy = np.empty((capacity, 2))
+
+    def __len__(self):
+        return self._n
+
+    def refresh(self, buffer):
+        """Fold in new ticks; returns the number of events added."""
+        (ts, symbols, price, _), self.position = buffer.since(self.position)
+        is_x = symbols == self.sym_x
+        is_y = symbols == self.sym_y
+        if is_x.any() or is_y.any():
+            # Position of the latest x trade at or before every tick
+            last = np.maximum.accumulate(np.where(is_x, np.arange(len(ts)), -1))
+            x = np.where(last >= 0, price[np.maximum(last, 0)], self._last_x)
+            if is_x.any():
+                self._last_x = float(price[last[-1]])
+            self._add(ts[is_y], x[is_y], price[is_y])
+        self._trim(buffer.first_ts)
+        return int(is_y.sum())
+
+    def _add(self, ts, x, y):
+        keep = ~np.isnan(x)  # y trades before the first x trade have no pair
+        ts, x, y = ts[keep], x[keep], y[keep]
+        n = len(ts)
+        if n == 0:
+            return
+        # Strictly increasing µs: us_i = max(ts_i, us_{i-1} + 1), as one running max
+        step = np.arange(n)
+        us = ts.astype("int64") * 1000 - step
+        us[0] = max(us[0], self._last_us + 1)
+        us = np.maximum.accumulate(us) + step
+        self._last_us = int(us[-1])
+
+        if self._n + n > len(self._ts):
+            size = max(2 * len(self._ts), self._n + n)
+            ts_new, xy_new = np.empty(size, dtype="int64"), np.empty((size, 2))
+            ts_new[:self._n], xy_new[:self._n] = self._ts[:self._n], self._xy[:self._n]
+            self._ts, self._xy = ts_new, xy_new
+        self._ts[self._n:self._n + n] = us
+        self._xy[self._n:self._n + n, 0] = x
+        self._xy[self._n:self._n + n, 1] = y
+        self._n += n
+
+    def _trim(self, first_ts):
+        if first_ts is None or self._n == 0:
+            return
+        drop = int(np.searchsorted(self._ts[:self._n], first_ts * 1000, side="left"))
+        if drop:
+            self._ts[:self._n - drop] = self._ts[drop:self._n]
+            self._xy[:self._n - drop] = self._xy[drop:self._n]
+            self._n -= drop
+
+    def frame(self, tz="UTC"):
+        """Events as a DataFrame indexed by event time with columns x, y."""
+        index = pd.DatetimeIndex(self._ts[:self._n].view("datetime64[us]")).tz_localize("UTC")
+        if tz != "UTC":
+            index = index.tz_convert(tz)
+        return pd.DataFrame(self._xy[:self._n].copy(), index=index, columns=["x", "y"])
+
+def _spread_stats(x, y, mx, my, vx, vy, cxy, beta):
+    """Spread moments from pair moments: s = y - beta*x."""
+    spread = y - beta * x
+    mean_s = my - beta * mx
+    var_s = vy - 2 * beta * cxy + beta * beta * vx
+    std_s = np.sqrt(np.maximum(var_s, 0.0))
+    # Same convention as the batch path: zero std -> NaN
+    std_s = np.where(std_s > 0, std_s, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        zscore = (spread - mean_s) / std_s
+        corr = cxy / np.sqrt(vx * vy)
+    return spread, zscore, corr, std_s
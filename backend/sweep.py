@@ -0,0 +1,138 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOWS = tuple(range(20, 201, 20))
+DEFAULT_LOOKAHEADS = (1, 2, 5, 10, 20)
+DEFAULT_THRESHOLDS = (1.0, 1.5, 2.0, 2.5, 3.0)
+
+SWEEP_COLUMNS = ["window", "lookahead", "z_threshold", "slope", "hit_rate", "alerts"]
+
+# Grids smaller than this (bars x windows x lookaheads) run in-process: about
+# 0.3s of numpy work, less than handing the tasks to worker processes costs
+INPROCESS_MAX_WORK = 2_000_000
+
+# Worker-side view of the shared (2, n) x/y block of the current sweep, set by _attach()
+_shm = None
+_xy = None
+
+def _attach(name, shape):
+    global _shm, _xy
+    if _shm is not None:
+        if _shm.name == name:
+            return
+        _xy = None
+        _shm.close()
+    _shm = shared_memory.SharedMemory(name=name)
+    _xy = np.ndarray(shape, dtype="float64", buffer=_shm.buf)
+
+def make_pool(max_workers=None):
+    """
+    Worker pool for sweep(pool=...). Workers are spawned once and attach to
+    each sweep's shared block on its first task, so a long-lived pool saves
+    the process start-up on every sweep.
+    """
+    # spawn: forking a threaded server process (Streamlit) is unsafe
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+def rolling_zscore(spread, window):
+    """Rolling z-score (ddof=1, min_periods=window) via cumulative sums."""
+    n = len(spread)
+    z = np.full(n, np.nan)
+    if n < window:
+        return z
+    centered = spread - spread.mean()
+    c1 = np.concatenate(([0.0], np.cumsum(centered)))
+    c2 = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    s1 = c1[window:] - c1[:-window]
+    s2 = c2[window:] - c2[:-window]
+    mean = s1 / window
+    var = np.maximum((s2 - s1 * mean) / (window - 1), 0.0)
+    std = np.sqrt(var)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z[window - 1:] = np.where(std > 0, (centered[window - 1:] - mean) / std, np.nan)
+    return z
+
+def evaluate_window(x, y, window, lookaheads, thresholds):
+    """
+    All (lookahead, threshold) cells for one window: spread from the static
+    OLS beta, rolling z-score, then for every lookahead the slope of the
+    future spread change on z (negative = mean reversion), and per threshold
+    the number of alerts (|z| > threshold) and the share of them followed by
+    a move back towards the mean (hit rate).
+    """
+    xc = x - x.mean()
+    beta = float(xc @ (y - y.mean()) / (xc @ xc)) if xc @ xc > 0 else np.nan
+    spread = y - beta * x
+    z = rolling_zscore(spread, window)
+
+    rows = []
+    for k in lookaheads:
+        change = np.full(len(spread), np.nan)
+        if k < len(spread):
+            change[:-k] = spread[k:] - spread[:-k]
+        valid = ~np.isnan(z) & ~np.isnan(change)
+        zv, cv = z[valid], change[valid]
+        slope = float(np.polyfit(zv, cv, 1)[0]) if len(zv) > 2 and zv.std() > 0 else np.nan
+        for threshold in thresholds:
+            alert = np.abs(zv) > threshold
+            alerts = int(alert.sum())
+            hits = np.sign(cv[alert]) == -np.sign(zv[alert])
+            rows.append((window, k, threshold, slope, float(hits.mean()) if alerts else np.nan, alerts))
+    return rows
+
+def _run_window(name, shape, window, lookaheads, thresholds):
+    _attach(name, shape)
+    return evaluate_window(_xy[0], _xy[1], window, lookaheads, thresholds)
+
+def sweep(x, y, windows=DEFAULT_WINDOWS, lookaheads=DEFAULT_LOOKAHEADS,
+          thresholds=DEFAULT_THRESHOLDS, max_workers=None, pool=None):
+    """
+    Signal efficacy over a (window, lookahead, z-threshold) grid for one
+    aligned pair of close arrays. One task per window runs in a process
+    pool; the price arrays are placed once in shared memory that workers
+    attach to, so tasks only carry the grid parameters. `pool` (see
+    make_pool) is reused and left running; without it a pool is started
+    for this call. max_workers=1, or a grid below INPROCESS_MAX_WORK, runs
+    in-process. Returns a DataFrame with SWEEP_COLUMNS.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    windows = [int(w) for w in windows if 2 <= w <= len(x)]
+    lookaheads, thresholds = tuple(lookaheads), tuple(thresholds)
+    if not windows:
+        return pd.DataFrame(columns=SWEEP_COLUMNS)
+    if max_workers is None:
+        max_workers = min(len(windows), os.cpu_count() or 1)
+
+    if max_workers <= 1 or len(x) * len(windows) * len(lookaheads) < INPROCESS_MAX_WORK:
+        rows = [r for w in windows for r in evaluate_window(x, y, w, lookaheads, thresholds)]
+        return pd.DataFrame(rows, columns=SWEEP_COLUMNS)
+
+    shm = shared_memory.SharedMemory(create=True, size=2 * len(x) * 8)
+    own_pool = pool is None
+    try:
+        xy = np.ndarray((2, len(x)), dtype="float64", buffer=shm.buf)
+        xy[0], xy[1] = x, y
+        if own_pool:
+            pool = make_pool(max_workers)
+        futures = [pool.submit(_run_window, shm.name, xy.shape, w, lookaheads, thresholds) for w in windows]
+        rows = [r for f in futures for r in f.result()]
+        del xy
+    finally:
+        if own_pool and pool is not None:
+            pool.shutdown()
+        shm.close()
+        shm.unlink()
+    logger.info(f"Sweep done: {len(windows)} windows x {len(lookaheads)} lookaheads x {len(thresholds)} thresholds")
+    return pd.DataFrame(rows, columns=SWEEP_COLUMNS)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the backend modules the way the app does (backend/ on sys.path)
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND not in sys.path:
+    sys.path.insert(0, BACKEND)
@@ -0,0 +1,37 @@
+from storage import TickWriter, get_connection, init_db, rebuild_bars
+
+T0 = 1_700_000_040_000  # start of a minute
+
+def _ticks(seconds):
+    # Price rises with time, so the true open/close are the first/last second
+    return [(T0 + s * 1000, "btcusdt", 100.0 + s, 1.0, s) for s in seconds]
+
+def _bar(db_path, rule="1min"):
+    conn = get_connection(db_path)
+    try:
+        return conn.execute(
+            f"SELECT open, high, low, close, volume FROM bars_{rule} WHERE ts = ?", (T0,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+def test_backfilled_ticks_keep_open_and_close_in_time_order(tmp_path):
+    db_path = str(tmp_path / "ticks.db")
+    init_db(db_path)
+    writer = TickWriter(db_path)
+    writer.write_many(_ticks([1, 2, 3, 7, 8, 9, 10]))
+    writer.flush(force=True)
+    # Gap recovered later, e.g. by the backfiller
+    writer.write_many(_ticks([4, 5, 6]))
+    writer.flush(force=True)
+    # And a late tick before everything seen so far
+    writer.write_many(_ticks([0]))
+    writer.close()
+
+    assert _bar(db_path) == (100.0, 110.0, 100.0, 110.0, 11.0)
+
+    conn = get_connection(db_path)
+    with conn:
+        rebuild_bars(conn)
+    conn.close()
+    assert _bar(db_path) == (100.0, 110.0, 100.0, 110.0, 11.0)
@@ -0,0 +1,34 @@
+import time
+
+from pipeline import IngestPipeline
+
+class FlakyWriter:
+    """Raises on the first write_many, then records rows."""
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = []
+
+    def write_many(self, rows):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("database is locked")
+        self.rows.extend(rows)
+
+def test_write_error_is_counted_and_draining_continues():
+    writer = FlakyWriter()
+    pipeline = IngestPipeline(writer, decode=lambda msg: msg, batch_size=10).start()
+    for i in range(10):
+        pipeline.submit(i)
+    # Let the first batch hit the failing write before queueing the rest
+    deadline = time.monotonic() + 5.0
+    while pipeline.stats()["processed"] < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    for i in range(10, 30):
+        pipeline.submit(i)
+
+    assert pipeline.stop(timeout=5.0)
+    stats = pipeline.stats()
+    assert stats["write_errors"] == 1
+    assert stats["processed"] == 30
+    assert writer.rows == list(range(10, 30))
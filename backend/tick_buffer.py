@@ -0,0 +1,191 @@
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from storage import load_tick_rows_since
+from archive import iter_archive, archived_symbols
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOOKBACK = "6h"
+
+class TickBuffer:
+    """
+    In-process tick frame that survives Streamlit reruns.
+    refresh() only reads rows past the rowid watermark and appends them to
+    column arrays, so the cost of a refresh scales with the new ticks rather
+    than with the table. Rows older than `lookback` (relative to the newest
+    tick) are dropped from the front.
+
+    With a `ring` (the ingest daemon's ringbuffer.TickRing) new ticks are
+    copied straight from shared memory; SQLite is only read for the initial
+    history and whenever the ring cannot cover the gap since the watermark.
+    """
+
+    def __init__(self, symbols=None, lookback=DEFAULT_LOOKBACK, capacity=4096, ring=None):
+        self.symbols = list(symbols) if symbols is not None else None
+        self.ring = ring
+        self.lookback = lookback
+        self.lookback_ms = int(pd.Timedelta(lookback).total_seconds() * 1000)
+        self.watermark = 0
+        # Rows ever appended; since() positions are counted on this scale
+        self.appended = 0
+
+        self._names = []
+        self._codes = {}
+        self._ts = np.empty(capacity, dtype="int64")
+        self._sym = np.empty(capacity, dtype="int32")
+        self._price = np.empty(capacity, dtype="float64")
+        self._qty = np.empty(capacity, dtype="float64")
+        self._start = 0
+        self._end = 0
+        self._base = 0  # logical position of physical row 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def refresh(self):
+        """Pull new ticks from SQLite. Returns the number of rows appended."""
+        start = None
+        if self.watermark == 0:
+            # First read: only the lookback window, via the (symbol, ts) index
+            start = int(time.time() * 1000) - self.lookback_ms
+            self._load_archive(start)
+        elif self.ring is not None:
+            appended = self._refresh_from_ring()
+            if appended is not None:
+                return appended
+        new = load_tick_rows_since(self.watermark, self.symbols, start)
+        if new.empty:
+            return 0
+
+        self.watermark = int(new["id"].iloc[-1])
+        codes = np.fromiter(
+            (self._code(s) for s in new["symbol"]), dtype="int32", count=len(new)
+        )
+        self._append(new["ts"].to_numpy(), codes, new["price"].to_numpy(), new["qty"].to_numpy())
+        self._trim()
+        logger.debug(f"TickBuffer appended {len(new)} rows (watermark={self.watermark})")
+        return len(new)
+
+    def _refresh_from_ring(self):
+        """Append ticks past the watermark from the ring; None means read SQLite instead."""
+        read = self.ring.since(self.watermark)
+        if read is None:
+            return None
+        # None also covers rows committed by another process (e.g. backfill),
+        # which never reach the ring
+        (ids, ts, sym, price, qty), count = read
+        if not len(ids):
+            return 0
+
+        names = self.ring.names()
+        codes = np.full(int(sym.max()) + 1, -1, dtype="int32")
+        for sid, name in names.items():
+            if sid < len(codes) and (self.symbols is None or name in self.symbols):
+                codes[sid] = self._code(name)
+        keep = codes[sym] >= 0
+        appended, last_id = self.appended, int(ids[-1])
+        # Copies out of shared memory, then checks the writer did not lap the rows
+        self._append(ts[keep], codes[sym[keep]], price[keep], qty[keep])
+        if self.ring.lapped(count, len(ids)):
+            self._end -= self.appended - appended
+            self.appended = appended
+            return None
+        self.watermark = last_id
+        if len(self):
+            self._trim()
+        logger.debug(f"TickBuffer appended {self.appended - appended} ring rows (watermark={self.watermark})")
+        return self.appended - appended
+
+    def _load_archive(self, start):
+        # Closed days compacted out of SQLite; they precede the SQLite tail.
+        # One-off copy here so the buffer stays in time order across symbols.
+        names = self.symbols if self.symbols is not None else archived_symbols()
+        chunks = [(name, cols) for name in names for cols in iter_archive(name, start)]
+        if not chunks:
+            return
+        ts = np.concatenate([cols["ts"] for _, cols in chunks])
+        codes = np.concatenate([
+            np.full(len(cols["ts"]), self._code(name), dtype="int32") for name, cols in chunks
+        ])
+        price = np.concatenate([cols["price"] for _, cols in chunks])
+        qty = np.concatenate([cols["qty"] for _, cols in chunks])
+        order = np.argsort(ts, kind="stable")
+        self._append(ts[order], codes[order], price[order], qty[order])
+
+    def frame(self, tz="UTC"):
+        """Current window as a DataFrame (timestamp, symbol, price, qty) in `tz`."""
+        sl = slice(self._start, self._end)
+        # Views over the buffer; appends never write inside the live region
+        timestamp = pd.Series(self._ts[sl].view("datetime64[ms]")).dt.tz_localize("UTC")
+        if tz != "UTC":
+            timestamp = timestamp.dt.tz_convert(tz)
+        names = np.asarray(self._names, dtype=object)
+        return pd.DataFrame({
+            "timestamp": timestamp,
+            "symbol": names[self._sym[sl]] if self._names else np.empty(0, dtype=object),
+            "price": self._price[sl],
+            "qty": self._qty[sl],
+        }, copy=False)
+
+    @property
+    def first_ts(self):
+        """Epoch ms of the oldest tick in the window, None when empty."""
+        return int(self._ts[self._start]) if len(self) else None
+
+    def since(self, position):
+        """
+        Rows appended after logical `position` that are still in the window,
+        as (ts, symbol, price, qty) arrays plus the position to resume from.
+        Lets streaming consumers (e.g. bar builders) read only new ticks.
+        """
+        start = max(position - self._base, self._start)
+        sl = slice(start, self._end)
+        names = np.asarray(self._names, dtype=object)
+        symbols = names[self._sym[sl]] if self._names else np.empty(0, dtype=object)
+        return (self._ts[sl], symbols, self._price[sl], self._qty[sl]), self.appended
+
+    def _code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    def _append(self, ts, sym, price, qty):
+        n = len(ts)
+        if self._end + n > len(self._ts):
+            self._grow(n)
+        sl = slice(self._end, self._end + n)
+        self._ts[sl] = ts
+        self._sym[sl] = sym
+        self._price[sl] = price
+        self._qty[sl] = qty
+        self._end += n
+        self.appended += n
+
+    def _grow(self, extra):
+        # Compact to the front and double if still more than half full.
+        # New arrays are allocated so frames handed out earlier stay valid.
+        live = len(self)
+        capacity = len(self._ts)
+        while live + extra > capacity // 2:
+            capacity *= 2
+        sl = slice(self._start, self._end)
+        for name in ("_ts", "_sym", "_price", "_qty"):
+            old = getattr(self, name)
+            arr = np.empty(capacity, dtype=old.dtype)
+            arr[:live] = old[sl]
+            setattr(self, name, arr)
+        self._base += self._start
+        self._start, self._end = 0, live
+
+    def _trim(self):
+        live = self._ts[self._start:self._end]
+        cutoff = live.max() - self.lookback_ms
+        # Ticks arrive (nearly) in time order, so the stale rows are a prefix
+        drop = int(np.searchsorted(live, cutoff, side="left"))
+        self._start += drop